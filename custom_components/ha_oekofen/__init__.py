@@ -2,11 +2,11 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta
 from typing import Any
 
-import async_timeout
-import oekofen_api
-import time
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     CONF_HOST,
@@ -14,15 +14,18 @@ from homeassistant.const import (
     CONF_PORT,
     CONF_SCAN_INTERVAL,
 )
-from homeassistant.core import HomeAssistant
+from homeassistant.core import HomeAssistant, ServiceCall, callback
 from homeassistant.exceptions import ConfigEntryNotReady
 from homeassistant.helpers import device_registry as dr
-from homeassistant.helpers.update_coordinator import (
-    DataUpdateCoordinator,
-    UpdateFailed,
-)
 
 from . import const
+from .api import OekofenAsyncApi
+from .coordinator import OekofenCoordinator
+from .csv_log import LogPosition, OekofenLogReader
+from .hub import async_get_hub
+from .key_index import OekofenKeyIndex
+from .log_statistics import OekofenStatisticsImporter
+from .storage import OekofenStorage
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -39,47 +42,43 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     hass.data.setdefault(const.DOMAIN, {})
     entry.async_on_unload(entry.add_update_listener(update_listener))
+    entry.async_on_unload(ha_client.hub.async_register(entry.entry_id))
 
     assert entry.unique_id
 
-    # Fetch data
-    # await ha_client.api.update_data()
-
-    async def _async_update_data():
-        """Update Oekofen client via Coordinator"""
-        async with async_timeout.timeout(20):
-            try:
-                return await ha_client.async_api_update_data()
-            except Exception as err:
-
-                raise UpdateFailed(err) from err
-
-    coordinator = DataUpdateCoordinator[oekofen_api.Oekofen](
+    coordinator = OekofenCoordinator(
         hass,
-        _LOGGER,
-        name=f"{ha_client.api.get_name()} CoordinatorLogger",
-        update_method=_async_update_data,
-        update_interval=const.SCAN_INTERVAL,
+        ha_client,
+        update_interval=ha_client.update_interval,
     )
 
     # Fetch data first time
-    await coordinator.async_config_entry_first_refresh()
-
-    # Wait 2500ms
-    await asyncio.sleep(2.5)
-    sw_version = await hass.async_add_executor_job(ha_client.api.get_version)
+    first_refresh_error = None
+    try:
+        await coordinator.async_config_entry_first_refresh()
+    except ConfigEntryNotReady as err:
+        first_refresh_error = err
+    if not ha_client.api.domain_names:
+        # controller not reachable, set up the entities from the last payload
+        if not ha_client.async_load_discovery_cache():
+            raise first_refresh_error or ConfigEntryNotReady
+        _LOGGER.warning(
+            "%s not reachable, setting up the entities from the cached payload",
+            entry.title,
+        )
 
-    # register device
+    # register device, model and name are part of the first payload, the
+    # version of the last start is used until fetched in the background
     device_registry = dr.async_get(hass)
     model = ha_client.api.get_model()
     model_long = const.MODEL_ABBR.get(model, model)
-    device_registry.async_get_or_create(
+    device = device_registry.async_get_or_create(
         config_entry_id=entry.entry_id,
         identifiers={(const.DOMAIN, entry.unique_id)},
         manufacturer=const.MANUFACTURER,
         name=ha_client.api.get_name(),
         model=model_long,
-        sw_version=sw_version,
+        sw_version=ha_client.storage.get(const.STORAGE_KEY_SW_VERSION),
     )
 
     hass.data.setdefault(const.DOMAIN, {})[entry.entry_id] = {
@@ -89,9 +88,68 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     await hass.config_entries.async_forward_entry_setups(entry, const.PLATFORMS)
 
+    entry.async_create_background_task(
+        hass,
+        _async_update_sw_version(hass, ha_client, device.id),
+        f"{const.DOMAIN} version {entry.title}",
+    )
+
+    if "recorder" in hass.config.components:
+        importer = OekofenStatisticsImporter(hass, ha_client)
+        hass.data[const.DOMAIN][entry.entry_id][const.KEY_STATISTICS_IMPORTER] = importer
+        entry.async_create_background_task(
+            hass,
+            _async_import_log_statistics(importer),
+            f"{const.DOMAIN} log statistics import {entry.title}",
+        )
+    async_setup_services(hass)
+
     return True
 
 
+async def _async_update_sw_version(
+    hass: HomeAssistant, ha_client: HAOekofenEntity, device_id: str
+) -> None:
+    """Fetch the firmware version and update the device if it changed."""
+    try:
+        sw_version = await ha_client.api.async_get_version()
+    except Exception as ex:
+        _LOGGER.debug("[_async_update_sw_version] Fetching the version failed: %s", ex)
+        return
+    if sw_version is None or sw_version == ha_client.storage.get(
+        const.STORAGE_KEY_SW_VERSION
+    ):
+        return
+    ha_client.storage.async_set(const.STORAGE_KEY_SW_VERSION, sw_version)
+    dr.async_get(hass).async_update_device(device_id, sw_version=sw_version)
+
+
+async def _async_import_log_statistics(importer: OekofenStatisticsImporter) -> None:
+    try:
+        await importer.async_import()
+    except Exception as ex:
+        _LOGGER.warning("[_async_import_log_statistics] CSV log import failed: %s", ex)
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services once."""
+    if hass.services.has_service(const.DOMAIN, const.SERVICE_IMPORT_LOG_STATISTICS):
+        return
+
+    async def _async_handle_import_log_statistics(call: ServiceCall) -> None:
+        for entry_data in list(hass.data.get(const.DOMAIN, {}).values()):
+            importer = entry_data.get(const.KEY_STATISTICS_IMPORTER)
+            if importer is not None:
+                await _async_import_log_statistics(importer)
+
+    hass.services.async_register(
+        const.DOMAIN,
+        const.SERVICE_IMPORT_LOG_STATISTICS,
+        _async_handle_import_log_statistics,
+    )
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload Atag config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, const.PLATFORMS)
@@ -101,6 +159,11 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove persisted data of a removed config entry."""
+    await OekofenStorage(hass, entry.unique_id).async_remove()
+
+
 async def update_listener(hass: HomeAssistant, config_entry: ConfigEntry) -> None:
     """Handle options update."""
     await hass.config_entries.async_reload(config_entry.entry_id)
@@ -122,6 +185,10 @@ async def async_migrate_entry(hass, config_entry: ConfigEntry):
     return True
 
 
+def _get_layout(raw_data: dict[str, Any]) -> dict[str, list[str]]:
+    return {domain: sorted(attributes) for domain, attributes in raw_data.items()}
+
+
 class HAOekofenEntity(object):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry) -> None:
         assert entry.unique_id
@@ -130,47 +197,146 @@ class HAOekofenEntity(object):
         self.entry_id = entry.entry_id
         self.unique_id = entry.unique_id
         self.device_name = entry.title
-        self.host: str = entry.data[CONF_HOST]
-        self._password = entry.data[CONF_PASSWORD]
-        self._port = entry.data[CONF_PORT]
-        self._update_interval = entry.data[CONF_SCAN_INTERVAL]
-        self._raise_exceptions_on_update = entry.data.get(
+        # options flow values override the ones from the config flow
+        config = {**entry.data, **entry.options}
+        self.host: str = config[CONF_HOST]
+        self._password = config[CONF_PASSWORD]
+        self._port = config[CONF_PORT]
+        self._update_interval = config[CONF_SCAN_INTERVAL]
+        self.raise_exceptions_on_update: bool = config.get(
             const.CONF_RAISE_EXCEPTION_ON_UPDATE, False
         )
+        self.stale_after: int = config.get(
+            const.CONF_STALE_AFTER, const.DEFAULT_STALE_AFTER
+        )
+        self.selective_fetch_max_share: int = config.get(
+            const.CONF_SELECTIVE_FETCH_MAX_SHARE,
+            const.DEFAULT_SELECTIVE_FETCH_MAX_SHARE,
+        )
+        self.adaptive_polling: bool = config.get(
+            const.CONF_ADAPTIVE_POLLING, const.DEFAULT_ADAPTIVE_POLLING
+        )
+        self.scan_interval_min: int = config.get(
+            const.CONF_SCAN_INTERVAL_MIN, const.DEFAULT_SCAN_INTERVAL_MIN
+        )
+        self.scan_interval_max: int = config.get(
+            const.CONF_SCAN_INTERVAL_MAX, const.DEFAULT_SCAN_INTERVAL_MAX
+        )
+        self.adaptive_hysteresis: int = config.get(
+            const.CONF_ADAPTIVE_HYSTERESIS, const.DEFAULT_ADAPTIVE_HYSTERESIS
+        )
         self._data_from_api = {}
+        # set if async_api_update_data returned the old data
+        self.last_update_error: Exception | None = None
 
-        self.api: oekofen_api.Oekofen | None = None
+        self.hub = async_get_hub(hass)
+        self.api: OekofenAsyncApi | None = None
         self.api_lock = asyncio.Lock()
+        self.key_index = OekofenKeyIndex()
+        self.storage = OekofenStorage(hass, entry.unique_id)
+        self.log_reader: OekofenLogReader | None = None
+        self._started_from_cache = False
 
-    def _setup(self) -> bool:
-        self.api = oekofen_api.Oekofen(
-            host=self.host,
-            json_password=self._password,
-            port=self._port,
-            update_interval=self._update_interval,
-        )
-        # asyncio.run(self.api.update_data())
-        return True
-
-    # def update_data(self):
-    #    return asyncio.run(self.api.update_data())
+    @property
+    def update_interval(self) -> timedelta:
+        return timedelta(seconds=self._update_interval)
 
     async def async_setup(self) -> bool:
         async with self.api_lock:
-            if not await self.hass.async_add_executor_job(self._setup):
-                return False
+            self.api = OekofenAsyncApi(
+                session=self.hub.session,
+                host=self.host,
+                json_password=self._password,
+                port=self._port,
+                update_interval=self._update_interval,
+                request_limiter=self.hub.request_limiter,
+            )
+            await self.storage.async_load()
+            self.log_reader = OekofenLogReader(
+                self.api,
+                LogPosition.from_dict(
+                    self.storage.get(const.STORAGE_KEY_LOG_POSITION)
+                ),
+            )
+        return True
+
+    @callback
+    def async_load_discovery_cache(self) -> bool:
+        """Parse the cached payload, returns False if there is none."""
+        raw_data = self.storage.get(const.STORAGE_KEY_DISCOVERY)
+        if not raw_data:
+            return False
+        self.api._parse_raw_data(raw_data)
+        self._started_from_cache = True
         return True
 
-    async def async_api_update_data(self) -> dict[str, Any] | None:
-        _LOGGER.debug("[HAOekofenEntity.async_api_update_data] calleddd, is this the auto-update? self._raise_exceptions_on_update=%s", self._raise_exceptions_on_update)
+    @callback
+    def _async_update_discovery_cache(self) -> None:
+        """Cache the payload if the domains or their attributes changed."""
+        raw_data = self.api.raw_data
+        cached_raw_data = self.storage.get(const.STORAGE_KEY_DISCOVERY)
+        if cached_raw_data and _get_layout(cached_raw_data) == _get_layout(raw_data):
+            return
+        _LOGGER.debug("[HAOekofenEntity._async_update_discovery_cache] layout changed")
+        self.storage.async_set(const.STORAGE_KEY_DISCOVERY, raw_data)
+        if self._started_from_cache:
+            # entities were set up from an outdated layout
+            self._started_from_cache = False
+            self.hass.async_create_task(
+                self.hass.config_entries.async_reload(self.entry_id)
+            )
+
+    async def async_read_log(self) -> AsyncIterator[tuple[datetime, dict[str, Any]]]:
+        """Yield new rows of the CSV log and persist the read position."""
+        try:
+            async for row in self.log_reader.async_read_rows():
+                yield row
+        finally:
+            self.storage.async_set(
+                const.STORAGE_KEY_LOG_POSITION, self.log_reader.position.as_dict()
+            )
+
+    async def async_api_ping(self) -> None:
+        """Check the controller answers again, raises if not.
+
+        A failed ping counts as failed poll, a successful one doesn't as it
+        fetched no data.
+        """
+        wait_start = time.monotonic()
+        async with self.api_lock:
+            self.api.stats.start_poll([], time.monotonic() - wait_start)
+            try:
+                await self.api.async_ping()
+            except (asyncio.CancelledError, Exception) as e:
+                self.api.stats.end_poll(e)
+                raise
+            self.api.stats.discard_poll()
+
+    async def async_api_update_data(
+        self, domains: list[str] | None = None
+    ) -> dict[str, Any] | None:
+        _LOGGER.debug("[HAOekofenEntity.async_api_update_data] domains=%s, self.raise_exceptions_on_update=%s", domains, self.raise_exceptions_on_update)
+        wait_start = time.monotonic()
         async with self.api_lock:
+            self.api.stats.start_poll(domains, time.monotonic() - wait_start)
             try:
-                self._data_from_api = await self.hass.async_add_executor_job(
-                    self.api.update_data
-                )
+                if domains:
+                    self._data_from_api = await self.api.async_update_domains(domains)
+                else:
+                    self._data_from_api = await self.api.async_update_data()
+                    self._async_update_discovery_cache()
+                self.api.stats.end_poll()
+                self.last_update_error = None
                 return self._data_from_api
+            except asyncio.CancelledError as e:
+                # coordinator timeout
+                self.api.stats.end_poll(e)
+                raise
             except Exception as e:
-                if self._raise_exceptions_on_update:
+                self.api.stats.end_poll(e)
+                self.last_update_error = e
+                if self.raise_exceptions_on_update or not self._data_from_api:
+                    # no old data to return
                     raise e
                 _LOGGER.debug("[HAOekofenEntity.async_api_update_data] Returning old data (self._data_from_api)")
                 return self._data_from_api
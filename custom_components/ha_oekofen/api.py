@@ -0,0 +1,359 @@
+"""Async transport for the Oekofen JSON interface."""
+from __future__ import annotations
+
+import asyncio
+import ipaddress
+import json
+import logging
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from contextlib import AbstractAsyncContextManager, nullcontext
+from datetime import datetime
+from typing import Any
+
+import aiohttp
+import oekofen_api
+from yarl import URL
+
+from . import const
+from .governor import OekofenRequestGovernor
+from .poll_stats import PollStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OekofenAsyncApi(oekofen_api.Oekofen):
+    """oekofen_api.Oekofen using a shared aiohttp session instead of urllib.
+
+    Parsing (domains, attributes, flattened ``data``) is the same as in
+    ``oekofen_api``, only the HTTP part is replaced by non-blocking calls.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        host: str,
+        json_password: str,
+        port: int = oekofen_api.const.DEFAULT_PORT,
+        update_interval: int = oekofen_api.const.UPDATE_INTERVAL_SECONDS,
+        request_timeout: float = const.REQUEST_TIMEOUT,
+        request_limiter: asyncio.Semaphore | None = None,
+    ):
+        super().__init__(
+            host=host,
+            json_password=json_password,
+            port=port,
+            update_interval=update_interval,
+        )
+        self._session = session
+        self._port = port
+        self._json_password = json_password
+        self.request_timeout = request_timeout
+        # limits the requests in flight to all controllers, see OekofenHub
+        self._request_limiter: AbstractAsyncContextManager = (
+            request_limiter or nullcontext()
+        )
+        self.attributes_by_key: dict[str, oekofen_api.Attribute] = {}
+        self.stats = PollStats(redact=json_password)
+        # every request to the controller goes through the governor
+        self.governor = OekofenRequestGovernor()
+
+    @property
+    def domain_names(self) -> list[str]:
+        """Return the domains of the last payload, i.e. ``["system", "hk1"]``."""
+        return list(self._raw_data)
+
+    @property
+    def raw_data(self) -> dict[str, Any]:
+        """Return the last payload, i.e. ``{"hk1": {"L_pump": {...}}}``."""
+        return self._raw_data
+
+    def _build_url(self, path: str) -> URL:
+        # encoded=True keeps the trailing "?" of "all?" which the controller
+        # needs to include formats, yarl would drop an empty query otherwise
+        return URL.build(
+            scheme="http",
+            host=self.host,
+            port=self._port,
+            path=f"/{self._json_password}/{path}",
+            encoded=True,
+        )
+
+    async def _async_fetch_data(
+        self,
+        path: str,
+        is_json: bool = True,
+        priority: int = const.REQUEST_PRIORITY_POLL,
+        retry: bool = True,
+    ) -> dict | str | None:
+        try:
+            if "=" in path:
+                raw_data = await self._async_request_in_slot(path, priority)
+            else:
+                raw_data = await self.governor.async_read(
+                    path, lambda: self._async_request(path), priority
+                )
+        except aiohttp.ClientResponseError:
+            if not retry:
+                raise
+            # controller answered with an error, the governor keeps the gap
+            return await self._async_fetch_data(
+                path, is_json=is_json, priority=priority, retry=False
+            )
+
+        text = raw_data.decode(oekofen_api.const.CHARSET)
+        if is_json:
+            return json.loads(text)
+        return text
+
+    async def _async_request_in_slot(self, path: str, priority: int) -> bytes:
+        async with self.governor.async_slot(priority):
+            return await self._async_request(path)
+
+    def get_request_timeout(self) -> float:
+        """Return the timeout of the next request, adapted to the measured
+        latencies of this controller (see ``const.REQUEST_TIMEOUT_*``)."""
+        if len(self.stats.request_latencies) < const.REQUEST_TIMEOUT_MIN_SAMPLES:
+            return self.request_timeout
+        p95 = self.stats.request_latency_percentile(0.95)
+        return min(
+            max(p95 * const.REQUEST_TIMEOUT_FACTOR, const.REQUEST_TIMEOUT_FLOOR),
+            const.REQUEST_TIMEOUT_CEILING,
+        )
+
+    def get_update_timeout(self, requests: int = 1) -> float:
+        """Return the timeout of ``requests`` requests in a row, including
+        the gaps the governor keeps between them."""
+        return requests * (self.get_request_timeout() + self.governor.min_gap)
+
+    async def _async_request(self, path: str) -> bytes:
+        _status, _headers, raw_data = await self._async_get(path)
+        return raw_data
+
+    async def _async_get(
+        self,
+        path: str,
+        headers: dict[str, str] | None = None,
+        timeout: aiohttp.ClientTimeout | None = None,
+    ) -> tuple[int, Mapping[str, str], bytes]:
+        _LOGGER.debug("[OekofenAsyncApi._async_get] GET %s %s", path, headers or "")
+        async with self._request_limiter:
+            start = time.monotonic()
+            self.stats.requests_in_flight += 1
+            try:
+                async with self._session.get(
+                    self._build_url(path),
+                    headers=headers,
+                    timeout=timeout
+                    or aiohttp.ClientTimeout(total=self.get_request_timeout()),
+                    raise_for_status=True,
+                ) as resp:
+                    try:
+                        raw_data = await resp.read()
+                    except asyncio.CancelledError:
+                        # abandoned, i.e. by the coordinator timeout: close the
+                        # socket instead of reading the rest into the pool
+                        resp.close()
+                        raise
+            except asyncio.CancelledError:
+                self.stats.cancelled_requests += 1
+                raise
+            except asyncio.TimeoutError:
+                self.stats.record_request_timeout(time.monotonic() - start)
+                raise
+            finally:
+                self.stats.requests_in_flight -= 1
+        self.stats.record_request(time.monotonic() - start, len(raw_data))
+        return resp.status, resp.headers, raw_data
+
+    async def async_fetch_range(
+        self, path: str, start: int, size: int
+    ) -> tuple[bytes, bool]:
+        """Fetch up to ``size`` bytes of ``path`` from byte ``start``.
+
+        Each chunk is one request at background priority, the governor slot
+        is given back in between so polls and writes are not held up by a
+        long read. Returns the data and whether the controller honoured the
+        Range header, if not the data is all of ``path``. Raises
+        ``ClientResponseError`` 416 if ``start`` is at or behind the end.
+        """
+        async with self.governor.async_slot(const.REQUEST_PRIORITY_BACKGROUND):
+            status, _headers, raw_data = await self._async_get(
+                path,
+                headers={aiohttp.hdrs.RANGE: f"bytes={start}-{start + size - 1}"},
+                # the whole log if the Range header is ignored
+                timeout=aiohttp.ClientTimeout(
+                    total=None, sock_read=self.request_timeout
+                ),
+            )
+        return raw_data, status == 206
+
+    def _parse_raw_data(self, raw_data: dict) -> dict[str, Any]:
+        """Flatten raw json to ``self.data``, see oekofen_api.Oekofen.update_data."""
+        start = time.monotonic()
+        self._raw_data = raw_data
+        self._last_fetch = datetime.now()
+        self.domains = OrderedDict()
+        self.attributes_by_key = {}
+        self.data = {
+            "system_indexes": [""],  # empty domain
+            "weather_indexes": [""],  # empty domain
+            "forecast_indexes": [""],  # empty domain
+            "error_indexes": [""],  # empty domain
+            "meta_indexes": [""],  # empty domain, injected
+            "hk_indexes": [],
+            "pu_indexes": [],
+            "ww_indexes": [],
+            "circ_indexes": [],
+            "pe_indexes": [],
+            "sk_indexes": [],
+        }
+
+        for domain_with_index, attributes_dict in raw_data.items():
+            index_nrs = re.findall(oekofen_api.const.RE_FIND_NUMBERS, domain_with_index)
+            index_nr = int(index_nrs[0]) if index_nrs else None
+            domain_name = domain_with_index.replace(str(index_nr), "")
+            domain = oekofen_api.Domain(oekofen=self, name=domain_name, index=index_nr)
+            self.domains.setdefault(domain_name, []).append(domain)
+
+            if index_nr is not None:
+                self.data.setdefault(f"{domain_name}_indexes", [])
+                self.data[f"{domain_name}_indexes"].append(index_nr)
+
+            domain.update_attributes(data=attributes_dict)
+
+            for att_key, att_instance in domain.attributes.items():
+                key = f"{domain_with_index}.{att_key}"
+                self.attributes_by_key[key] = att_instance
+                self.data[key] = att_instance.get_value()
+                if att_instance.choices is not None:
+                    self.data[f"{key}_choice"] = att_instance.get_choice()
+                if att_instance.min is not None:
+                    self.data[f"{key}_min"] = att_instance.get_min_value()
+                if att_instance.max is not None:
+                    self.data[f"{key}_max"] = att_instance.get_max_value()
+                if att_instance.attributes:
+                    # i.e. humidity and battery of thirdparty sensors
+                    self.data[f"{key}{const.ATTRIBUTES_KEY_SUFFIX}"] = att_instance.attributes
+
+        self.data["meta.ip_host"] = self.host
+        self.data["meta.installateur_code"] = self.get_installateur_code()
+        self.stats.record_parse(time.monotonic() - start)
+        return self.data
+
+    def get_attribute_by_key(self, key: str) -> oekofen_api.Attribute | None:
+        """Return the attribute for ``key`` ("pe1.L_temp_act")."""
+        return self.attributes_by_key.get(key)
+
+    async def async_update_data(self) -> dict[str, Any]:
+        """Fetch ``all?`` and return the flattened data."""
+        raw_data = await self._async_fetch_data(
+            oekofen_api.const.URL_PATH_ALL_WITH_FORMATS
+        )
+        return self._parse_raw_data(raw_data)
+
+    async def async_probe(self) -> dict[str, Any]:
+        """Fetch only the first pellematic, enough for ``get_uid`` and
+        ``get_model``."""
+        raw_data = await self._async_fetch_data(f"{const.PROBE_DOMAIN}?")
+        if const.PROBE_DOMAIN not in raw_data:
+            raw_data = {const.PROBE_DOMAIN: raw_data}
+        return self._parse_raw_data(raw_data)
+
+    async def async_ping(self) -> None:
+        """Fetch the short version text without parsing, raises if the
+        controller doesn't answer."""
+        await self._async_fetch_data("??", is_json=False, retry=False)
+
+    async def async_update_domains(self, domains: list[str]) -> dict[str, Any]:
+        """Fetch only ``domains`` (i.e. ``["pe1", "hk1"]``) and merge them
+        into the last payload."""
+        if not self._raw_data:
+            return await self.async_update_data()
+        raw_data = dict(self._raw_data)
+        for domain in domains:
+            domain_data = await self._async_fetch_data(f"{domain}?")
+            if domain not in domain_data:
+                domain_data = {domain: domain_data}
+            raw_data.update(domain_data)
+        return self._parse_raw_data(raw_data)
+
+    async def async_get_version(self) -> str | None:
+        text_data = await self._async_fetch_data(
+            "??", is_json=False, priority=const.REQUEST_PRIORITY_BACKGROUND
+        )
+        first_line = text_data.split("\n")[0].split(oekofen_api.const.VERSION_SEPERATOR)
+        # "['Oekofen JSON Interface', 'V4.00b', 'http://www.oekofen.at']"
+        if len(first_line) == 3:
+            return first_line[1]
+        return None
+
+    async def async_set_attribute_value(self, att: oekofen_api.Attribute, value):
+        if not isinstance(att, oekofen_api.ControllableAttribute):
+            return False
+        if att.factor and isinstance(value, float):
+            # oekofen_api truncates int(21.5 / 0.1) to 214, send the rounded
+            # raw value instead
+            val = att.generate_new_value(
+                value=round(value / att.factor), value_in_human_format=False
+            )
+        else:
+            val = att.generate_new_value(value=value, value_in_human_format=True)
+        if att.domain.index is None:
+            dom_att = f"{att.domain.name}.{att.key}"
+        else:
+            dom_att = f"{att.domain.name}{att.domain.index}.{att.key}"
+
+        path = URL().with_name(f"{dom_att}={val}")
+        # not retried, the controller might have applied the assignment
+        # before answering with an error
+        await self._async_fetch_data(
+            str(path),
+            is_json=False,
+            priority=const.REQUEST_PRIORITY_WRITE,
+            retry=False,
+        )
+        return value
+
+
+async def async_discover(
+    session: aiohttp.ClientSession,
+    network: ipaddress.IPv4Network,
+    json_password: str,
+    port: int = oekofen_api.const.DEFAULT_PORT,
+) -> list[OekofenAsyncApi]:
+    """Probe all hosts of ``network``, ``const.DISCOVERY_CONCURRENCY`` at once.
+
+    Returns the clients of the controllers that answered with a payload
+    ``get_uid`` and ``get_model`` can be read from, other hosts are skipped.
+    """
+    semaphore = asyncio.Semaphore(const.DISCOVERY_CONCURRENCY)
+
+    async def _async_probe(host: str) -> OekofenAsyncApi | None:
+        client = OekofenAsyncApi(
+            session=session,
+            host=host,
+            json_password=json_password,
+            port=port,
+            request_timeout=const.DISCOVERY_TIMEOUT,
+        )
+        async with semaphore:
+            try:
+                await client.async_probe()
+                client.get_uid()
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                return None
+            except (AttributeError, KeyError, TypeError, ValueError) as ex:
+                # not a controller, i.e. another JSON service answering with
+                # a list or without pe1
+                _LOGGER.debug("[async_discover] skipped %s: %r", host, ex)
+                return None
+        _LOGGER.debug("[async_discover] found %s", host)
+        return client
+
+    results = await asyncio.gather(
+        *(_async_probe(str(host)) for host in network.hosts())
+    )
+    return [client for client in results if client is not None]
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import ipaddress
+import logging
 from typing import Any
 
 from homeassistant.core import callback
@@ -9,10 +11,14 @@ from homeassistant.data_entry_flow import FlowResult
 import oekofen_api
 import voluptuous as vol
 from homeassistant import config_entries
+from homeassistant.components import network
 from homeassistant.const import CONF_HOST, CONF_PORT, CONF_PASSWORD, CONF_SCAN_INTERVAL
-from homeassistant.util.network import is_ipv4_address
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
 
 from . import const
+from .api import OekofenAsyncApi, async_discover
+
+_LOGGER = logging.getLogger(__name__)
 
 DATA_SCHEMA = {
     vol.Required(CONF_HOST): str,
@@ -23,6 +29,7 @@ DATA_SCHEMA = {
     ): vol.Coerce(int),
     vol.Optional(const.CONF_RAISE_EXCEPTION_ON_UPDATE, default=True): vol.Coerce(bool),
 }
+CONF_NETWORK = "network"
 
 
 class OekofenConfigFlow(config_entries.ConfigFlow, domain=const.DOMAIN):
@@ -38,8 +45,16 @@ class OekofenConfigFlow(config_entries.ConfigFlow, domain=const.DOMAIN):
         """Get the options flow for the Flux LED component."""
         return OekofenOptionsFlow(config_entry)
 
+    def __init__(self) -> None:
+        self._discovered: dict[str, OekofenAsyncApi] = {}
+        self._discovery_input: dict[str, Any] = {}
+
     async def async_step_user(self, user_input=None):
         """Handle a flow initialized by the user."""
+        return self.async_show_menu(step_id="user", menu_options=["discovery", "manual"])
+
+    async def async_step_manual(self, user_input=None):
+        """Enter host and password."""
 
         if not user_input:
             return await self._show_form()
@@ -48,34 +63,112 @@ class OekofenConfigFlow(config_entries.ConfigFlow, domain=const.DOMAIN):
         port = user_input[CONF_PORT]
         json_password = user_input[CONF_PASSWORD]
         update_interval = user_input[CONF_SCAN_INTERVAL]
-        client = oekofen_api.Oekofen(
+        client = OekofenAsyncApi(
+            session=async_get_clientsession(self.hass),
             host=host,
             port=port,
             json_password=json_password,
             update_interval=update_interval,
         )
-        if not is_ipv4_address(str(host)):
-            return self.async_abort(reason="not_ipv4_address")
 
         try:
-            await self.hass.async_add_executor_job(client.update_data)
-            # print("Finished oekofen_api.Oekofen client=%s" % client)
+            # pe1 only, the full payload is fetched by the integration
+            await client.async_probe()
         except Exception as ex:
             return await self._show_form({"base": str(ex)})
 
+        return await self._async_create_entry(client, user_input)
+
+    async def async_step_discovery(self, user_input=None):
+        """Scan a network for controllers answering on the JSON port."""
+        errors: dict[str, str] = {}
+        if user_input is not None:
+            try:
+                scan_network = ipaddress.IPv4Network(
+                    user_input[CONF_NETWORK], strict=False
+                )
+            except ValueError:
+                errors[CONF_NETWORK] = "invalid_network"
+            else:
+                if scan_network.prefixlen < const.DISCOVERY_MIN_PREFIXLEN:
+                    errors[CONF_NETWORK] = "network_too_large"
+            if not errors:
+                clients = await async_discover(
+                    async_get_clientsession(self.hass),
+                    scan_network,
+                    json_password=user_input[CONF_PASSWORD],
+                    port=user_input[CONF_PORT],
+                )
+                configured = self._async_current_ids()
+                self._discovered = {
+                    client.host: client
+                    for client in clients
+                    if client.get_uid() not in configured
+                }
+                self._discovery_input = user_input
+                if self._discovered:
+                    return await self.async_step_pick()
+                errors["base"] = "no_devices_found"
+
+        default_network = ""
+        try:
+            source_ip = await network.async_get_source_ip(self.hass)
+            default_network = str(ipaddress.IPv4Network(f"{source_ip}/24", strict=False))
+        except Exception as ex:
+            _LOGGER.debug("[OekofenConfigFlow.async_step_discovery] No source ip: %s", ex)
+
+        return self.async_show_form(
+            step_id="discovery",
+            data_schema=vol.Schema(
+                {
+                    vol.Required(CONF_NETWORK, default=default_network): str,
+                    vol.Required(
+                        CONF_PORT, default=oekofen_api.const.DEFAULT_PORT
+                    ): vol.Coerce(int),
+                    vol.Required(CONF_PASSWORD): str,
+                }
+            ),
+            errors=errors,
+        )
+
+    async def async_step_pick(self, user_input=None):
+        """Select one of the discovered controllers."""
+        if user_input is not None:
+            client = self._discovered[user_input[CONF_HOST]]
+            return await self._async_create_entry(
+                client,
+                {
+                    CONF_HOST: client.host,
+                    CONF_PORT: self._discovery_input[CONF_PORT],
+                    CONF_PASSWORD: self._discovery_input[CONF_PASSWORD],
+                    CONF_SCAN_INTERVAL: oekofen_api.const.UPDATE_INTERVAL_SECONDS,
+                    const.CONF_RAISE_EXCEPTION_ON_UPDATE: True,
+                },
+            )
+
+        hosts = {
+            host: f"Oekofen {client.get_model()} ({host})"
+            for host, client in self._discovered.items()
+        }
+        return self.async_show_form(
+            step_id="pick",
+            data_schema=vol.Schema({vol.Required(CONF_HOST): vol.In(hosts)}),
+        )
+
+    async def _async_create_entry(self, client: OekofenAsyncApi, data: dict[str, Any]):
         client_uid = client.get_uid()
         await self.async_set_unique_id(client_uid)
-        self._abort_if_unique_id_configured(updates=user_input)
+        self._abort_if_unique_id_configured(updates=data)
 
         model = client.get_model()
         title = f"Oekofen {model}"
 
-        return self.async_create_entry(title=title, data=user_input)
+        return self.async_create_entry(title=title, data=data)
 
     async def _show_form(self, errors=None):
         """Show the form to the user."""
         return self.async_show_form(
-            step_id="user",
+            step_id="manual",
             data_schema=vol.Schema(DATA_SCHEMA),
             errors=errors if errors else {},
         )
@@ -94,28 +187,76 @@ class OekofenOptionsFlow(config_entries.OptionsFlow):
         """Configure the options."""
         errors: dict[str, str] = {}
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            scan_interval_min = user_input.get(
+                const.CONF_SCAN_INTERVAL_MIN, const.DEFAULT_SCAN_INTERVAL_MIN
+            )
+            scan_interval_max = user_input.get(
+                const.CONF_SCAN_INTERVAL_MAX, const.DEFAULT_SCAN_INTERVAL_MAX
+            )
+            if scan_interval_min > scan_interval_max:
+                errors["base"] = "scan_interval_min_above_max"
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
         options = self._config_entry.options
         data = self._config_entry.data
 
-        print("[OekofenOptionsFlow.async_step_init] _config_entry.options=", options)
-        print("[OekofenOptionsFlow.async_step_init] _config_entry.data=", data)
+        _LOGGER.debug("[OekofenOptionsFlow.async_step_init] _config_entry.options=%s", options)
 
-        # we are using data (and not options) here
+        # saved options override the values from the config flow (data), the
+        # rejected input the saved options
+        config = {**data, **options, **(user_input or {})}
 
         options_schema = vol.Schema(
             {
                 vol.Required(
                     CONF_SCAN_INTERVAL,
-                    default=data.get(
+                    default=config.get(
                         CONF_SCAN_INTERVAL, oekofen_api.const.UPDATE_INTERVAL_SECONDS
                     ),
                 ): vol.Coerce(int),
                 vol.Optional(
                     const.CONF_RAISE_EXCEPTION_ON_UPDATE,
-                    default=data.get(const.CONF_RAISE_EXCEPTION_ON_UPDATE, False),
+                    default=config.get(const.CONF_RAISE_EXCEPTION_ON_UPDATE, False),
+                ): vol.Coerce(bool),
+                vol.Optional(
+                    const.CONF_ADAPTIVE_POLLING,
+                    default=config.get(
+                        const.CONF_ADAPTIVE_POLLING, const.DEFAULT_ADAPTIVE_POLLING
+                    ),
                 ): vol.Coerce(bool),
+                vol.Optional(
+                    const.CONF_SCAN_INTERVAL_MIN,
+                    default=config.get(
+                        const.CONF_SCAN_INTERVAL_MIN, const.DEFAULT_SCAN_INTERVAL_MIN
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    const.CONF_SCAN_INTERVAL_MAX,
+                    default=config.get(
+                        const.CONF_SCAN_INTERVAL_MAX, const.DEFAULT_SCAN_INTERVAL_MAX
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    const.CONF_ADAPTIVE_HYSTERESIS,
+                    default=config.get(
+                        const.CONF_ADAPTIVE_HYSTERESIS,
+                        const.DEFAULT_ADAPTIVE_HYSTERESIS,
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=1)),
+                vol.Optional(
+                    const.CONF_STALE_AFTER,
+                    default=config.get(
+                        const.CONF_STALE_AFTER, const.DEFAULT_STALE_AFTER
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0)),
+                vol.Optional(
+                    const.CONF_SELECTIVE_FETCH_MAX_SHARE,
+                    default=config.get(
+                        const.CONF_SELECTIVE_FETCH_MAX_SHARE,
+                        const.DEFAULT_SELECTIVE_FETCH_MAX_SHARE,
+                    ),
+                ): vol.All(vol.Coerce(int), vol.Range(min=0, max=100)),
             }
         )
 
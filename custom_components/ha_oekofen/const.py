@@ -1,3 +1,5 @@
+from __future__ import annotations
+
 import datetime
 
 from homeassistant.components.water_heater import (
@@ -10,15 +12,60 @@ from homeassistant.const import Platform
 DOMAIN = "ha_oekofen"
 UPDATE_INTERVAL = 20
 SCAN_INTERVAL = datetime.timedelta(seconds=UPDATE_INTERVAL)
+REQUEST_TIMEOUT = 20
+# once REQUEST_TIMEOUT_MIN_SAMPLES requests were measured, the timeout is
+# REQUEST_TIMEOUT_FACTOR * p95 of the last request latencies, clamped to
+# REQUEST_TIMEOUT_FLOOR..REQUEST_TIMEOUT_CEILING
+REQUEST_TIMEOUT_MIN_SAMPLES = 10
+REQUEST_TIMEOUT_FACTOR = 3
+REQUEST_TIMEOUT_FLOOR = 5
+REQUEST_TIMEOUT_CEILING = 60
+# the controller rejects requests coming faster, see OekofenRequestGovernor
+REQUEST_MIN_GAP = 2.5
+# requests in flight to all controllers together, see OekofenHub
+HUB_MAX_REQUESTS_IN_FLIGHT = 4
+# governor priorities, lower first
+REQUEST_PRIORITY_WRITE = 0
+REQUEST_PRIORITY_POLL = 1
+REQUEST_PRIORITY_BACKGROUND = 2
+# writes to the same attribute within this time are sent once
+WRITE_DEBOUNCE_SECONDS = 0.5
+# after a write the written domains are polled every BURST_INTERVAL until
+# they didn't change for BURST_SETTLE_UPDATES updates, at most BURST_DURATION
+BURST_INTERVAL = datetime.timedelta(seconds=5)
+BURST_DURATION = datetime.timedelta(seconds=60)
+BURST_SETTLE_UPDATES = 3
+# after BREAKER_FAILURE_THRESHOLD failed updates in a row the controller is
+# polled with exponential backoff (update interval * 2^n, at most
+# BREAKER_MAX_BACKOFF, +-BREAKER_JITTER) and a ping before each full update
+BREAKER_FAILURE_THRESHOLD = 3
+BREAKER_MAX_BACKOFF = datetime.timedelta(minutes=10)
+BREAKER_JITTER = 0.2
+# identifying domain fetched by the config flow instead of "all?"
+PROBE_DOMAIN = "pe1"
+# LAN discovery in the config flow
+DISCOVERY_CONCURRENCY = 32
+DISCOVERY_TIMEOUT = 3
+# largest network scanned, /22 = 1022 hosts
+DISCOVERY_MIN_PREFIXLEN = 22
+# data key of the state attributes of a key, i.e. "thirdparty1.L_state_attributes"
+ATTRIBUTES_KEY_SUFFIX = "_attributes"
+# Domains injected by oekofen_api, not served by the controller
+INJECTED_DOMAINS = {"meta"}
 PLATFORMS = [
     Platform.BINARY_SENSOR,
     Platform.SENSOR,
     Platform.SWITCH,
     Platform.BUTTON,
+    Platform.SELECT,
+    Platform.NUMBER,
     # Platform.WATER_HEATER,
 ]
 KEY_COORDINATOR = "ha_oekofen_coordinator"
 KEY_OEKOFENHOMEASSISTANT = "ha_oekofen_hass"
+KEY_STATISTICS_IMPORTER = "ha_oekofen_statistics_importer"
+# hass.data key of the OekofenHub shared by all entries
+KEY_HUB = "ha_oekofen_hub"
 ENTRY_KEY_HOST = "host"
 ENTRY_KEY_JSON_PASSWORD = "json_password"
 ENTRY_KEY_PORT = "port"
@@ -26,6 +73,25 @@ ENTRY_KEY_UPDATE_INTERVAL = "update_interval"
 SW_VERSION = "1.0 Unknown Version"
 MANUFACTURER = "ÖkoFEN"
 CONF_RAISE_EXCEPTION_ON_UPDATE = "raise_exception_on_update"
+CONF_ADAPTIVE_POLLING = "adaptive_polling"
+CONF_SCAN_INTERVAL_MIN = "scan_interval_min"
+CONF_SCAN_INTERVAL_MAX = "scan_interval_max"
+CONF_ADAPTIVE_HYSTERESIS = "adaptive_hysteresis"
+CONF_STALE_AFTER = "stale_after"
+CONF_SELECTIVE_FETCH_MAX_SHARE = "selective_fetch_max_share"
+DEFAULT_ADAPTIVE_POLLING = False
+DEFAULT_SCAN_INTERVAL_MIN = 10
+DEFAULT_SCAN_INTERVAL_MAX = 300
+# consecutive idle updates before backing off to CONF_SCAN_INTERVAL_MAX
+DEFAULT_ADAPTIVE_HYSTERESIS = 3
+# seconds without a successful update before the entities become
+# unavailable, 0 keeps the old values forever
+DEFAULT_STALE_AFTER = 900
+# percent of the controller's domains up to which the due domains are
+# fetched one by one. Each request pays a round trip and the controller's
+# minimum gap, above it a single "all?" request is cheaper. 0 always
+# fetches "all?"
+DEFAULT_SELECTIVE_FETCH_MAX_SHARE = 30
 MODEL_ABBR = {
     "PE": "Pellematic PE",
     "PES": "Pellematic PES",
@@ -40,6 +106,12 @@ MODEL_ABBR = {
     "AIR": "Pellematic Air",
 }
 
+# pe L_state values (see oekofen_api.const._PE_L_STATES) during which the
+# burner is running or changing state: Start, Zuendung, Softstart,
+# Leistungsbrand, Nachlauf, Saugen, Einmessen
+PE_STATES_ACTIVE = [1, 2, 3, 4, 5, 7, 12]
+PE_STATES_OFF = [6, 97, 98, 99, 100, 101]
+
 SWITCH_IS_ON_VALUES = [1, "1", "true", True]
 TURN_SWITCH_ON = 1
 TURN_SWITCH_OFF = 0
@@ -130,6 +202,10 @@ NON_PUMP_BINARY_SENSORS_BY_DOMAIN = {
     "sk": ["mode"],
 }
 
+PE_BINARY_SENSORS_BY_DOMAIN = {
+    "pe": ["L_br", "L_ak", "L_not", "L_stb"],
+}
+
 WEIGHT_SENSORS_BY_DOMAIN = {
     "pe": [
         "L_storage_fill",
@@ -187,5 +263,116 @@ SELECT_BY_DOMAIN = {
     "pe": ["mode"],
 }
 
+# setpoints with min/max, written in the unit of the value (i.e. °C)
+NUMBERS_BY_DOMAIN = {
+    "hk": ["temp_heat", "temp_setback", "temp_vacation"],
+    "ww": ["temp_min_set", "temp_max_set"],
+}
+
 
 ICONS = {"ww": {"heat_once": "mdi:heat-wave"}}
+
+# Storage
+STORAGE_VERSION = 1
+STORAGE_SAVE_DELAY = 10
+STORAGE_KEY_LOG_POSITION = "log_position"
+STORAGE_KEY_SW_VERSION = "sw_version"
+# last payload, entities are set up from it if the controller is down
+STORAGE_KEY_DISCOVERY = "discovery"
+
+# CSV log (http://<ip>:<port>/<json_password>/log)
+CSV_LOG_PATH = "log"
+# bytes per Range request, the log is read in chunks between the polls
+CSV_LOG_CHUNK_SIZE = 64 * 1024
+CSV_LOG_SEPARATOR = ";"
+CSV_LOG_DATETIME_FORMAT = "%d.%m.%Y %H:%M:%S"
+# columns without domain index, i.e. "AT [°C]"
+CSV_LOG_COLUMNS = {
+    "AT": "system.L_ambient",
+}
+# columns with domain index, i.e. "PE1 KT[°C]" -> pe1.L_temp_act
+CSV_LOG_COLUMNS_BY_DOMAIN = {
+    "pe": {
+        "KT": "L_temp_act",
+        "KT_SOLL": "L_temp_set",
+        "UW Freigabe": "L_uw_release",
+        "Modulation": "L_modulation",
+        "FRT Ist": "L_frt_temp_act",
+        "FRT Soll": "L_frt_temp_set",
+        "FRT End": "L_frt_temp_end",
+        "Einschublaufzeit": "L_runtimeburner",
+        "Pausenzeit": "L_resttimeburner",
+        "Unterdruck Ist": "L_lowpressure",
+        "Unterdruck Soll": "L_lowpressure_set",
+        "Fuellstand": "L_storage_fill",
+        "Status": "L_state",
+    },
+    "hk": {
+        "VL Ist": "L_flowtemp_act",
+        "VL Soll": "L_flowtemp_set",
+        "RT Ist": "L_roomtemp_act",
+        "RT Soll": "L_roomtemp_set",
+        "Pumpe": "L_pump",
+    },
+    "ww": {
+        "EinT Ist": "L_ontemp_act",
+        "AusT Ist": "L_offtemp_act",
+        "Soll": "L_temp_set",
+        "Pumpe": "L_pump",
+    },
+    "pu": {
+        "TPO Ist": "L_tpo_act",
+        "TPO Soll": "L_tpo_set",
+        "TPM Ist": "L_tpm_act",
+        "TPM Soll": "L_tpm_set",
+        "Pumpe": "L_pump",
+    },
+}
+# log values are in display units, except zs (1/10 seconds)
+CSV_LOG_UNIT_CONVERSIONS = {"zs": (0.1, "s")}
+
+# Long-term statistics imported from the CSV log
+STORAGE_KEY_STATISTICS = "statistics"
+SERVICE_IMPORT_LOG_STATISTICS = "import_log_statistics"
+# statistics per add_external_statistics call
+STATISTICS_BATCH_SIZE = 500
+STATISTICS_IGNORED_ATTRIBUTES = ["L_state"]
+
+# Poll diagnostics
+POLL_STATS_HISTORY = 100
+# upper bounds (seconds) of the latency histogram buckets
+POLL_LATENCY_BUCKETS = [0.25, 0.5, 1, 2, 5, 10, 20]
+# polls included in the config entry diagnostics
+DIAGNOSTICS_POLLS = 20
+
+# Static state attributes of thirdparty sensors, not written by the recorder
+STATIC_ATTRIBUTES = ["type_id", "device_id", "device_id_2", "temp_capable", "device_ip"]
+
+# Polling tiers
+# The controller serves whole domains, so each domain is polled at the
+# interval of its tier: "fast" domains on every coordinator update, the
+# slowly changing ones (buffer, solar, ambient temperature, weather) less
+# often. A write polls its domain at once, see BURST_INTERVAL.
+POLL_TIER_FAST = "fast"
+POLL_TIER_NORMAL = "normal"
+POLL_TIER_SLOW = "slow"
+POLL_TIER_DEFAULT = POLL_TIER_FAST
+
+POLL_TIER_INTERVALS = {
+    POLL_TIER_FAST: datetime.timedelta(seconds=0),
+    POLL_TIER_NORMAL: datetime.timedelta(minutes=2),
+    POLL_TIER_SLOW: datetime.timedelta(minutes=30),
+}
+
+POLL_TIER_BY_DOMAIN = {
+    "pe": POLL_TIER_FAST,
+    "hk": POLL_TIER_FAST,
+    "ww": POLL_TIER_FAST,
+    "pu": POLL_TIER_NORMAL,
+    "sk": POLL_TIER_NORMAL,
+    "system": POLL_TIER_NORMAL,
+    "thirdparty": POLL_TIER_NORMAL,
+    "error": POLL_TIER_NORMAL,
+    "weather": POLL_TIER_SLOW,
+    "forecast": POLL_TIER_SLOW,
+}
@@ -1,27 +1,450 @@
 """Coordinator for Oekofen integration."""
+from __future__ import annotations
 
 import logging
+import random
 from abc import abstractmethod
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any
 
-import oekofen_api
-from homeassistant.core import callback
+import async_timeout
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers import event
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, CoordinatorEntity
+from homeassistant.helpers.update_coordinator import (
+    CoordinatorEntity,
+    DataUpdateCoordinator,
+    UpdateFailed,
+)
+from homeassistant.util import dt as dt_util
 
-from . import HAOekofenEntity
+from . import const
 from .const import DOMAIN
+from .write_queue import OekofenWriteQueue
+
+if TYPE_CHECKING:
+    from . import HAOekofenEntity
 
 _LOGGER: logging.Logger = logging.getLogger(__package__)
 
 
-class HAOekofenCoordinatorEntity(CoordinatorEntity[DataUpdateCoordinator[oekofen_api.Oekofen]]):
+class OekofenCoordinator(DataUpdateCoordinator[dict[str, Any]]):
+    """Fetches the controller domains used by the enabled entities."""
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        ha_client: HAOekofenEntity,
+        update_interval: timedelta,
+    ) -> None:
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"{ha_client.api.get_name()} CoordinatorLogger",
+            update_interval=update_interval,
+        )
+        self.ha_client = ha_client
+        self._domain_fetched_at: dict[str, datetime] = {}
+        self._idle_updates = 0
+        self._notified_data: dict[str, Any] | None = None
+        self._notified_update_success: bool | None = None
+        self.write_queue = OekofenWriteQueue(hass, self)
+        # burst polling after writes, see async_start_burst
+        self._burst_domains: set[str] = set()
+        self._burst_until: datetime | None = None
+        self._burst_unchanged_updates = 0
+        self._interval_before_burst: timedelta | None = None
+        # set while backing off, see _schedule_refresh
+        self._backing_off = False
+        self._unsub_stale_check: CALLBACK_TYPE | None = None
+
+    async def async_shutdown(self) -> None:
+        await super().async_shutdown()
+        await self.write_queue.async_shutdown()
+
+    @callback
+    def async_enabled_keys(self) -> set[str]:
+        """Return the data keys of all entities added to hass.
+
+        Disabled entities are never added, so the set follows the entity
+        registry: enabling reloads the entry, disabling removes the listener.
+        """
+        keys = set()
+        for context in self.async_contexts():
+            if isinstance(context, str):
+                keys.add(context)
+            else:
+                keys.update(context)
+        return keys
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update the listeners whose keys changed since the last update.
+
+        All listeners are updated on the first update and when
+        last_update_success changes, as it sets the availability. Listeners
+        without context are updated on every update.
+        """
+        previous_data = self._notified_data
+        self._notified_data = self.data
+        if (
+            previous_data is None
+            or self.data is None
+            or self.last_update_success != self._notified_update_success
+        ):
+            self._notified_update_success = self.last_update_success
+            super().async_update_listeners()
+            return
+
+        changed_keys = {
+            key
+            for key, value in self.data.items()
+            if key not in previous_data or previous_data[key] != value
+        }
+        # the state attributes are parsed from the same raw value as the
+        # state, i.e. a thirdparty sensor with an unchanged temperature
+        changed_keys.update(
+            key.removesuffix(const.ATTRIBUTES_KEY_SUFFIX)
+            for key in list(changed_keys)
+            if key.endswith(const.ATTRIBUTES_KEY_SUFFIX)
+        )
+        for update_callback, context in list(self._listeners.values()):
+            if context is None:
+                # no data keys, i.e. the poll diagnostics
+                update_callback()
+            elif isinstance(context, str):
+                if context in changed_keys:
+                    update_callback()
+            elif not changed_keys.isdisjoint(context):
+                update_callback()
+
+    @staticmethod
+    def _get_poll_tier(domain_with_index: str) -> str:
+        domain = domain_with_index.rstrip("0123456789")
+        return const.POLL_TIER_BY_DOMAIN.get(domain, const.POLL_TIER_DEFAULT)
+
+    @callback
+    def async_domains_to_update(self) -> list[str] | None:
+        """Return the due domains ("pe1", "system", ...) or None for all.
+
+        A domain with enabled keys is due when the interval of its poll
+        tier has passed since it was fetched the last time. Domains of a
+        burst are always due. Above ``selective_fetch_max_share`` percent of
+        the controller's domains a single "all?" request is used.
+        """
+        if self.data is None:
+            # first refresh discovers the domain indexes
+            return None
+        now = dt_util.utcnow()
+        domains = set(self._burst_domains)
+        for domain in {key.split(".", 1)[0] for key in self.async_enabled_keys()}:
+            if domain in const.INJECTED_DOMAINS or domain in domains:
+                continue
+            fetched_at = self._domain_fetched_at.get(domain)
+            tier_interval = const.POLL_TIER_INTERVALS[self._get_poll_tier(domain)]
+            if self._interval_before_burst is not None:
+                # bursting, keep the normal schedule for the other domains
+                tier_interval = max(tier_interval, self._interval_before_burst)
+            if fetched_at is None or now - fetched_at >= tier_interval:
+                domains.add(domain)
+        served_domains = [
+            domain
+            for domain in self.ha_client.api.domain_names
+            if domain not in const.INJECTED_DOMAINS
+        ]
+        if (
+            len(domains) * 100
+            > self.ha_client.selective_fetch_max_share * len(served_domains)
+        ):
+            return None
+        return sorted(domains)
+
+    @property
+    def breaker_open(self) -> bool:
+        """True after BREAKER_FAILURE_THRESHOLD failed updates in a row."""
+        return (
+            self.ha_client.api.stats.consecutive_failures
+            >= const.BREAKER_FAILURE_THRESHOLD
+        )
+
+    @property
+    def is_stale(self) -> bool:
+        """True if the last successful update is older than ``stale_after``."""
+        data_age = self.ha_client.api.stats.data_age()
+        return (
+            bool(self.ha_client.stale_after)
+            and data_age is not None
+            and data_age > self.ha_client.stale_after
+        )
+
+    @callback
+    def _schedule_refresh(self) -> None:
+        """Schedule a refresh in the phase of this entry (see OekofenHub),
+        with exponential backoff and jitter while the controller doesn't
+        answer."""
+        if self.update_interval is None:
+            return
+        if self.config_entry and self.config_entry.pref_disable_polling:
+            return
+        self._async_unsub_refresh()
+        now = self.hass.loop.time()
+        interval = self.update_interval.total_seconds()
+        if self.breaker_open:
+            failures = (
+                self.ha_client.api.stats.consecutive_failures
+                - const.BREAKER_FAILURE_THRESHOLD
+            )
+            backoff = min(
+                interval * 2 ** min(failures + 1, 16),
+                const.BREAKER_MAX_BACKOFF.total_seconds(),
+            )
+            backoff *= random.uniform(
+                1 - const.BREAKER_JITTER, 1 + const.BREAKER_JITTER
+            )
+            _LOGGER.debug(
+                "[OekofenCoordinator._schedule_refresh] failures=%s, next update in %.0fs",
+                failures + const.BREAKER_FAILURE_THRESHOLD,
+                backoff,
+            )
+            next_refresh = now + backoff
+        else:
+            next_refresh = now + interval
+            if interval > 0:
+                # move to the phase of this entry, by at most half an interval
+                phase = self.ha_client.hub.get_phase(self.ha_client.entry_id)
+                shift = (phase * interval - next_refresh) % interval
+                if shift > interval / 2:
+                    shift -= interval
+                next_refresh += shift
+        self._unsub_refresh = event.async_call_at(self.hass, self._job, next_refresh)
+        self._async_schedule_stale_check(now, next_refresh)
+
+    @callback
+    def _async_schedule_stale_check(self, now: float, next_refresh: float) -> None:
+        """Mark the data stale when it gets ``stale_after`` seconds old before
+        the next refresh, i.e. while backing off."""
+        data_age = self.ha_client.api.stats.data_age()
+        if (
+            not self.last_update_success
+            or not self.ha_client.stale_after
+            or data_age is None
+        ):
+            return
+        stale_at = now + self.ha_client.stale_after - data_age
+        if stale_at < next_refresh:
+            self._unsub_stale_check = event.async_call_at(
+                self.hass, self._async_mark_stale, stale_at
+            )
+
+    @callback
+    def _async_mark_stale(self, _now: datetime) -> None:
+        """Make the entities unavailable, no refresh ran since the check was
+        scheduled."""
+        self._unsub_stale_check = None
+        _LOGGER.debug(
+            "[OekofenCoordinator._async_mark_stale] no update for %ss",
+            self.ha_client.stale_after,
+        )
+        self.last_update_success = False
+        self.last_exception = UpdateFailed(
+            f"No update for more than {self.ha_client.stale_after} seconds"
+        )
+        self.async_update_listeners()
+
+    @callback
+    def _async_unsub_refresh(self) -> None:
+        super()._async_unsub_refresh()
+        if self._unsub_stale_check:
+            self._unsub_stale_check()
+            self._unsub_stale_check = None
+
+    async def _async_update_data(self) -> dict[str, Any]:
+        """Update Oekofen client via Coordinator"""
+        domains = self.async_domains_to_update()
+        if domains == []:
+            _LOGGER.debug("[OekofenCoordinator._async_update_data] no domain due")
+            return self.data
+        try:
+            if self.breaker_open:
+                # half open: a cheap ping before the full update
+                async with async_timeout.timeout(
+                    self.ha_client.api.get_update_timeout()
+                ):
+                    await self.ha_client.async_api_ping()
+            async with async_timeout.timeout(
+                self.ha_client.api.get_update_timeout(len(domains or [None]))
+            ):
+                data = await self.ha_client.async_api_update_data(domains=domains)
+        except Exception as err:
+            return self._handle_update_error(err)
+        if self.ha_client.last_update_error is not None:
+            # async_api_update_data returned the old data
+            return self._handle_update_error(self.ha_client.last_update_error)
+        if self._backing_off:
+            _LOGGER.info("%s is reachable again", self.ha_client.device_name)
+            self._backing_off = False
+
+        now = dt_util.utcnow()
+        for domain in domains or self.ha_client.api.domain_names:
+            self._domain_fetched_at[domain] = now
+        if self.ha_client.adaptive_polling:
+            self._adapt_update_interval(data)
+        if self._burst_until is not None:
+            self._update_burst(self.data, data)
+        return data
+
+    def _handle_update_error(self, err: Exception) -> dict[str, Any]:
+        """Raise UpdateFailed, or keep the old data if the user wants them
+        until they are ``stale_after`` seconds old."""
+        if self.breaker_open and not self._backing_off:
+            # logged once, the next failures only at debug level
+            _LOGGER.warning(
+                "%s is not reachable, backing off: %s",
+                self.ha_client.device_name,
+                err,
+            )
+            self._backing_off = True
+        if (
+            self.data is None
+            or self.ha_client.raise_exceptions_on_update
+            or self.is_stale
+        ):
+            raise UpdateFailed(err) from err
+        _LOGGER.debug(
+            "[OekofenCoordinator._handle_update_error] keeping old data: %s", err
+        )
+        return self.data
+
+    @callback
+    def async_start_burst(self, domains: list[str]) -> None:
+        """Poll ``domains`` every BURST_INTERVAL until they settle, i.e. after
+        a write the controller takes a few seconds to update states."""
+        if self._burst_until is None:
+            self._interval_before_burst = self.update_interval
+        self._burst_domains.update(domains)
+        self._burst_until = dt_util.utcnow() + const.BURST_DURATION
+        self._burst_unchanged_updates = 0
+        self.update_interval = min(const.BURST_INTERVAL, self._interval_before_burst)
+        _LOGGER.debug(
+            "[OekofenCoordinator.async_start_burst] domains=%s until %s",
+            self._burst_domains,
+            self._burst_until,
+        )
+
+    def _update_burst(self, previous_data: dict[str, Any], data: dict[str, Any]) -> None:
+        prefixes = tuple(f"{domain}." for domain in self._burst_domains)
+        changed = any(
+            previous_data.get(key) != value
+            for key, value in data.items()
+            if key.startswith(prefixes)
+        )
+        self._burst_unchanged_updates = 0 if changed else self._burst_unchanged_updates + 1
+        if (
+            self._burst_unchanged_updates < const.BURST_SETTLE_UPDATES
+            and dt_util.utcnow() < self._burst_until
+        ):
+            return
+        _LOGGER.debug(
+            "[OekofenCoordinator._update_burst] domains=%s settled=%s",
+            self._burst_domains,
+            self._burst_unchanged_updates >= const.BURST_SETTLE_UPDATES,
+        )
+        self.update_interval = self._interval_before_burst
+        self._burst_domains = set()
+        self._burst_until = None
+        self._interval_before_burst = None
+
+    async def async_refresh_domains(self, domains: list[str]) -> None:
+        """Fetch ``domains`` now, outside of the schedule, i.e. after a write.
+
+        Raises UpdateFailed if the read fails, the data is kept as it is.
+        """
+        try:
+            data = await self.ha_client.async_api_update_data(domains=domains)
+            if self.ha_client.last_update_error is not None:
+                # async_api_update_data returned the old data
+                raise self.ha_client.last_update_error
+        except Exception as err:
+            _LOGGER.debug(
+                "[OekofenCoordinator.async_refresh_domains] domains=%s failed: %s",
+                domains,
+                err,
+            )
+            # the message of a ClientResponseError has the URL with the password
+            raise UpdateFailed(
+                f"Reading back {', '.join(domains)} failed: {type(err).__name__}"
+            ) from err
+        now = dt_util.utcnow()
+        for domain in domains:
+            self._domain_fetched_at[domain] = now
+        self.async_set_updated_data(data)
+
+    def _get_burner_state(self, data: dict[str, Any]) -> tuple[bool, bool]:
+        """Return (active, idle) of all pe domains.
+
+        active: a burner is on or changing state (ignition, cleaning, ...)
+        idle: all burners are off and no heating circuit pump is running
+        """
+        active = False
+        idle = True
+        for pe_index in data.get("pe_indexes", []):
+            pe_state = data.get(f"pe{pe_index}.L_state")
+            if data.get(f"pe{pe_index}.L_br") or pe_state in const.PE_STATES_ACTIVE:
+                active = True
+            if pe_state not in const.PE_STATES_OFF:
+                idle = False
+        for hk_index in data.get("hk_indexes", []):
+            if data.get(f"hk{hk_index}.L_pump"):
+                idle = False
+        return active, idle and not active
+
+    def _adapt_update_interval(self, data: dict[str, Any]) -> None:
+        """Poll fast while the burner is active, back off when idle.
+
+        Backing off needs ``adaptive_hysteresis`` consecutive idle updates,
+        any activity switches back to the fast interval immediately.
+        """
+        active, idle = self._get_burner_state(data)
+        self._idle_updates = self._idle_updates + 1 if idle else 0
+
+        if active:
+            seconds = self.ha_client.scan_interval_min
+        elif self._idle_updates >= self.ha_client.adaptive_hysteresis:
+            seconds = self.ha_client.scan_interval_max
+        else:
+            seconds = self.ha_client.update_interval.total_seconds()
+
+        update_interval = timedelta(seconds=seconds)
+        if self._interval_before_burst is not None:
+            # applied at the end of the burst
+            self._interval_before_burst = update_interval
+            return
+        if update_interval != self.update_interval:
+            _LOGGER.debug(
+                "[OekofenCoordinator._adapt_update_interval] active=%s idle_updates=%s, update_interval %s -> %s",
+                active,
+                self._idle_updates,
+                self.update_interval,
+                update_interval,
+            )
+            self.update_interval = update_interval
+
+
+class HAOekofenCoordinatorEntity(CoordinatorEntity[OekofenCoordinator]):
     """Defines a base Oekofen entity."""
 
     def __init__(
-            self, coordinator: DataUpdateCoordinator[oekofen_api.Oekofen], oekofen_entity: HAOekofenEntity
+            self,
+            coordinator: OekofenCoordinator,
+            oekofen_entity: HAOekofenEntity,
+            context: str | tuple[str, ...] | None = None,
     ) -> None:
-        """Initialize the Oekofen entity."""
-        super().__init__(coordinator)
+        """Initialize the Oekofen entity.
+
+        ``context`` are the data keys the entity reads, used by the
+        coordinator to only fetch the domains in use.
+        """
+        super().__init__(coordinator, context)
         self._oekofen_entity = oekofen_entity
         self._name = oekofen_entity.device_name
         self._unique_id = oekofen_entity.unique_id
@@ -0,0 +1,233 @@
+"""Chunked reader for the controller's CSV log (``/PASSWORD/log``)."""
+from __future__ import annotations
+
+import logging
+import re
+from collections.abc import AsyncIterator, Iterable, Iterator, Mapping
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+import aiohttp
+import oekofen_api
+from homeassistant.util import dt as dt_util
+
+from . import const
+
+if TYPE_CHECKING:
+    from .api import OekofenAsyncApi
+
+_LOGGER = logging.getLogger(__name__)
+
+# "PE1 KT[°C]", "HK1 VL Ist[°C]", "AT [°C]", "HK1 Pumpe"
+RE_CSV_COLUMN = re.compile(
+    r"^(?:(?P<domain>[A-Za-z]+?)(?P<index>\d+)\s+)?(?P<name>.*?)\s*(?:\[(?P<unit>[^\]]*)\])?\s*$"
+)
+
+RE_UNSATISFIED_RANGE = re.compile(r"^bytes \*/(\d+)$")
+
+
+@dataclass
+class LogColumn:
+    """CSV column mapped to a data key."""
+
+    position: int
+    key: str
+    unit: str | None = None
+    factor: float | None = None
+
+
+@dataclass
+class LogPosition:
+    """Where the last read stopped, persisted between reads."""
+
+    offset: int = 0
+    last_timestamp: datetime | None = None
+    header: list[str] = field(default_factory=list)
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "offset": self.offset,
+            "last_timestamp": self.last_timestamp.isoformat()
+            if self.last_timestamp
+            else None,
+            "header": self.header,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any] | None) -> LogPosition:
+        if not data:
+            return cls()
+        last_timestamp = data.get("last_timestamp")
+        return cls(
+            offset=data.get("offset", 0),
+            last_timestamp=dt_util.parse_datetime(last_timestamp)
+            if last_timestamp
+            else None,
+            header=data.get("header", []),
+        )
+
+
+def map_columns(header: list[str]) -> list[LogColumn]:
+    """Map CSV header columns to the ``entity_description.key``s."""
+    columns = []
+    for position, title in enumerate(header):
+        match = RE_CSV_COLUMN.match(title.replace("[»C]", "[°C]"))
+        if match is None:
+            continue
+        name = match.group("name")
+        domain = match.group("domain")
+        if domain is None:
+            key = const.CSV_LOG_COLUMNS.get(name)
+        else:
+            attribute = const.CSV_LOG_COLUMNS_BY_DOMAIN.get(domain.lower(), {}).get(name)
+            key = f"{domain.lower()}{match.group('index')}.{attribute}" if attribute else None
+        if key is None:
+            continue
+        unit = match.group("unit") or None
+        factor = None
+        if unit in const.CSV_LOG_UNIT_CONVERSIONS:
+            factor, unit = const.CSV_LOG_UNIT_CONVERSIONS[unit]
+        columns.append(LogColumn(position=position, key=key, unit=unit, factor=factor))
+    return columns
+
+
+def parse_value(raw_value: str, factor: float | None = None) -> float | int | str | None:
+    raw_value = raw_value.strip()
+    if not raw_value:
+        return None
+    try:
+        if "," in raw_value:
+            value = float(raw_value.replace(",", "."))
+        else:
+            value = int(raw_value)
+    except ValueError:
+        return raw_value
+    if factor is not None:
+        return round(value * factor, 2)
+    return value
+
+
+def parse_timestamp(date_value: str, time_value: str) -> datetime | None:
+    """Return the row timestamp ("18.10.2026", "12:01:00") in UTC."""
+    try:
+        local_dt = datetime.strptime(
+            f"{date_value.strip()} {time_value.strip()}", const.CSV_LOG_DATETIME_FORMAT
+        )
+    except ValueError:
+        return None
+    return dt_util.as_utc(local_dt.replace(tzinfo=dt_util.DEFAULT_TIME_ZONE))
+
+
+def get_unsatisfied_range_size(headers: Mapping[str, str] | None) -> int | None:
+    """Return the size from the Content-Range ("bytes */1234") of a 416."""
+    if not headers:
+        return None
+    match = RE_UNSATISFIED_RANGE.match(headers.get(aiohttp.hdrs.CONTENT_RANGE, ""))
+    return int(match.group(1)) if match else None
+
+
+def parse_rows(
+    lines: Iterable[str], columns: list[LogColumn]
+) -> Iterator[tuple[datetime, dict[str, Any]]]:
+    """Yield ``(timestamp, {key: value})`` for CSV data lines."""
+    for line in lines:
+        cells = line.rstrip("\r\n").split(const.CSV_LOG_SEPARATOR)
+        if len(cells) < 2:
+            continue
+        timestamp = parse_timestamp(cells[0], cells[1])
+        if timestamp is None:
+            continue
+        values = {}
+        for column in columns:
+            if column.position < len(cells):
+                values[column.key] = parse_value(cells[column.position], column.factor)
+        yield timestamp, values
+
+
+class OekofenLogReader:
+    """Reads new rows of the CSV log since the last read.
+
+    The log is read in Range requests of ``const.CSV_LOG_CHUNK_SIZE`` bytes,
+    starting at the byte offset after the last complete line. If the
+    controller ignores the Range header the whole log is read once and the
+    lines before the offset are skipped. Rows not newer than
+    ``last_timestamp`` are dropped, so a rotated log is not read twice.
+    """
+
+    def __init__(self, api: OekofenAsyncApi, position: LogPosition | None = None) -> None:
+        self._api = api
+        self.position = position or LogPosition()
+        self.columns: list[LogColumn] = []
+
+    async def _async_iter_lines(self) -> AsyncIterator[str]:
+        """Yield complete data lines and advance ``position.offset``."""
+        offset = self.position.offset if self.position.header else 0
+        skip_until = offset
+        is_continued = False
+        while True:
+            try:
+                raw_data, is_partial = await self._api.async_fetch_range(
+                    const.CSV_LOG_PATH, offset, const.CSV_LOG_CHUNK_SIZE
+                )
+            except aiohttp.ClientResponseError as err:
+                if err.status != 416 or not offset:
+                    raise
+                size = get_unsatisfied_range_size(err.headers)
+                if is_continued or (size is not None and size >= offset):
+                    # nothing new since the last chunk or read
+                    return
+                # range not satisfiable, the log was rotated
+                _LOGGER.debug("[OekofenLogReader] log rotated, reading from start")
+                offset = skip_until = self.position.offset = 0
+                continue
+
+            if is_partial:
+                position = offset
+            else:
+                position = 0
+                if len(raw_data) < skip_until:
+                    # smaller than last time, the log was rotated
+                    skip_until = 0
+
+            # the part after the last newline is read again with the next chunk
+            *raw_lines, _incomplete = raw_data.split(b"\n")
+            for raw_line in raw_lines:
+                line_start = position
+                position += len(raw_line) + 1
+                line = raw_line.decode(oekofen_api.const.CHARSET)
+                if line_start == 0:
+                    self.position.header = line.rstrip("\r").split(
+                        const.CSV_LOG_SEPARATOR
+                    )
+                    continue
+                if line_start < skip_until:
+                    continue
+                self.position.offset = position
+                yield line
+
+            if not is_partial or len(raw_data) < const.CSV_LOG_CHUNK_SIZE:
+                return
+            if position == offset:
+                _LOGGER.warning(
+                    "[OekofenLogReader] line at byte %s longer than %s bytes, "
+                    "stopped reading",
+                    offset,
+                    const.CSV_LOG_CHUNK_SIZE,
+                )
+                return
+            offset = position
+            is_continued = True
+
+    async def async_read_rows(self) -> AsyncIterator[tuple[datetime, dict[str, Any]]]:
+        """Yield ``(timestamp, {key: value})`` of rows not read before."""
+        columns: list[LogColumn] | None = None
+        async for line in self._async_iter_lines():
+            if columns is None:
+                columns = self.columns = map_columns(self.position.header)
+            for timestamp, values in parse_rows((line,), columns):
+                last_timestamp = self.position.last_timestamp
+                if last_timestamp is not None and timestamp <= last_timestamp:
+                    continue
+                self.position.last_timestamp = timestamp
+                yield timestamp, values
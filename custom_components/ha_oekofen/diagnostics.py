@@ -0,0 +1,68 @@
+"""Diagnostics support for Oekofen."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_PASSWORD
+from homeassistant.core import HomeAssistant
+
+from . import const
+
+TO_REDACT = {CONF_PASSWORD, "meta.installateur_code"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    entry_data = hass.data[const.DOMAIN][entry.entry_id]
+    ha_client = entry_data[const.KEY_OEKOFENHOMEASSISTANT]
+    coordinator = entry_data[const.KEY_COORDINATOR]
+    api = ha_client.api
+    stats = api.stats
+
+    keys = {}
+    for key in ha_client.key_index.keys():
+        oekofen_key = ha_client.key_index.get(key)
+        att = api.get_attribute_by_key(key)
+        keys[key] = {
+            "domain": oekofen_key.domain,
+            "domain_index": oekofen_key.domain_index,
+            "attribute": oekofen_key.attribute,
+            "found": att is not None,
+            "unit": att.unit if att else None,
+            "factor": att.factor if att else None,
+        }
+
+    # errors are stored without the password, see PollStats.end_poll
+    polls = [record.as_dict() for record in list(stats.records)[-const.DIAGNOSTICS_POLLS:]]
+
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "coordinator": {
+            "update_interval": str(coordinator.update_interval),
+            "last_update_success": coordinator.last_update_success,
+            "enabled_keys": sorted(coordinator.async_enabled_keys()),
+            "request_timeout": api.get_request_timeout(),
+            "requests_in_flight": stats.requests_in_flight,
+            "cancelled_requests": stats.cancelled_requests,
+        },
+        "domain_indexes": {
+            key: value for key, value in api.data.items() if key.endswith("_indexes")
+        },
+        "keys": keys,
+        "raw_data": api.raw_data,
+        "data": async_redact_data(
+            {key: value for key, value in api.data.items() if not key.endswith("_indexes")},
+            TO_REDACT,
+        ),
+        "polls": {
+            "success_count": stats.success_count,
+            "failure_count": stats.failure_count,
+            "data_age": stats.data_age(),
+            "latency_histogram": stats.latency_histogram(),
+            "last": polls,
+        },
+    }
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import logging
-from dataclasses import dataclass
+from collections.abc import Iterator
+from dataclasses import dataclass, replace
 from datetime import date, datetime
 from decimal import Decimal
 from typing import Callable, Any
@@ -15,6 +16,7 @@ from homeassistant.components.sensor import (
     SensorEntityDescription,
     SensorDeviceClass,
     RestoreSensor,
+    SensorEntity,
     SensorStateClass,
 )
 from homeassistant.components.water_heater import (
@@ -25,22 +27,30 @@ from homeassistant.components.water_heater import (
 )
 from homeassistant.components.switch import SwitchEntity
 from homeassistant.components.button import ButtonEntity
+from homeassistant.components.number import (
+    NumberDeviceClass,
+    NumberEntity,
+    NumberEntityDescription,
+)
+from homeassistant.components.select import SelectEntity
 from homeassistant.const import (
     PERCENTAGE,
     TEMP_CELSIUS,
     UnitOfTemperature,
     ATTR_TEMPERATURE,
     UnitOfTime,
+    UnitOfInformation,
     MASS_KILOGRAMS,
 )
 from homeassistant.core import callback
-from homeassistant.helpers.entity import EntityCategory, DeviceInfo
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory, EntityDescription
 from homeassistant.helpers.typing import StateType
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-
+import oekofen_api
 
 from . import HAOekofenEntity, const
 from .coordinator import HAOekofenCoordinatorEntity
+from .poll_stats import PollStats
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -76,88 +86,252 @@ class OekofenBinaryAttributeDescription(BinarySensorEntityDescription):
 
 
 @dataclass
-class OekofenWaterHeaterAttributeDescription(WaterHeaterEntityEntityDescription):
-    attr_config: dict = None
-
+class OekofenNumberDescription(NumberEntityDescription):
+    key: str = None
+    name: str = None
+    icon: str = None
+    index: int = 0
 
-def get_temperature_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:thermometer")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        native_unit_of_measurement=TEMP_CELSIUS,
-        device_class=SensorDeviceClass.TEMPERATURE,
-        icon=icon,
-    )
 
+@dataclass
+class OekofenWaterHeaterAttributeDescription(WaterHeaterEntityEntityDescription):
+    attr_config: dict = None
 
-def get_statetext_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:text")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        entity_category=EntityCategory.DIAGNOSTIC,
-        native_unit_of_measurement=None,
-        device_class=None,
-        icon=icon,
-    )
 
+@dataclass
+class OekofenPollStatsDescription(SensorEntityDescription):
+    value: Callable[[PollStats], StateType] = lambda stats: None
+    attributes: Callable[[PollStats], dict[str, Any]] | None = None
+    entity_category: EntityCategory | None = EntityCategory.DIAGNOSTIC
+    # written on every poll, enabled on demand
+    entity_registry_enabled_default: bool = False
+
+
+POLL_STATS_DESCRIPTIONS = (
+    OekofenPollStatsDescription(
+        key="poll_latency",
+        name="Poll latency",
+        icon="mdi:timer-outline",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value=lambda stats: stats.last_successful.latency if stats.last_successful else None,
+        attributes=lambda stats: {
+            "histogram": stats.latency_histogram(),
+            "request_latency_p95": stats.request_latency_percentile(0.95),
+        },
+    ),
+    OekofenPollStatsDescription(
+        key="poll_bytes",
+        name="Poll payload size",
+        icon="mdi:download-network",
+        native_unit_of_measurement=UnitOfInformation.BYTES,
+        device_class=SensorDeviceClass.DATA_SIZE,
+        state_class=SensorStateClass.MEASUREMENT,
+        value=lambda stats: stats.last_successful.bytes if stats.last_successful else None,
+    ),
+    OekofenPollStatsDescription(
+        key="poll_parse_time",
+        name="Poll parse time",
+        icon="mdi:code-json",
+        native_unit_of_measurement=UnitOfTime.MILLISECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=1,
+        value=lambda stats: stats.last_successful.parse_time * 1000 if stats.last_successful else None,
+    ),
+    OekofenPollStatsDescription(
+        key="poll_lock_wait",
+        name="Poll lock wait",
+        icon="mdi:lock-clock",
+        native_unit_of_measurement=UnitOfTime.SECONDS,
+        device_class=SensorDeviceClass.DURATION,
+        state_class=SensorStateClass.MEASUREMENT,
+        suggested_display_precision=2,
+        value=lambda stats: stats.last.lock_wait if stats.last else None,
+    ),
+    OekofenPollStatsDescription(
+        key="poll_successes",
+        name="Poll successes",
+        icon="mdi:check-network",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value=lambda stats: stats.success_count,
+    ),
+    OekofenPollStatsDescription(
+        key="poll_failures",
+        name="Poll failures",
+        icon="mdi:close-network",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        entity_registry_enabled_default=True,
+        value=lambda stats: stats.failure_count,
+        attributes=lambda stats: {
+            "last_error": next(
+                (r.error for r in reversed(stats.records) if r.error), None
+            )
+        },
+    ),
+    OekofenPollStatsDescription(
+        key="cancelled_requests",
+        name="Cancelled requests",
+        icon="mdi:cancel",
+        state_class=SensorStateClass.TOTAL_INCREASING,
+        value=lambda stats: stats.cancelled_requests,
+        # cancelled requests are aborted, anything above one request in
+        # flight (i.e. a log chunk) would be a leaked one
+        attributes=lambda stats: {"in_flight": stats.requests_in_flight},
+    ),
+    OekofenPollStatsDescription(
+        # a timestamp, the frontend shows the age of the data without a
+        # state write per second
+        key="last_success",
+        name="Last successful poll",
+        icon="mdi:clock-check-outline",
+        device_class=SensorDeviceClass.TIMESTAMP,
+        value=lambda stats: stats.last_success,
+        attributes=lambda stats: {
+            "consecutive_failures": stats.consecutive_failures,
+        },
+    ),
+)
 
-def get_pump_percent_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:pump")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key} Pump",
-        native_unit_of_measurement=PERCENTAGE,
-        device_class=SensorDeviceClass.POWER_FACTOR,
-        icon=icon,
-    )
 
+@dataclass(frozen=True)
+class OekofenEntityTemplate:
+    """Description of ``attribute`` for every index of ``domain``.
 
-def get_percentage_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:percent")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        native_unit_of_measurement=PERCENTAGE,
-        device_class=SensorDeviceClass.POWER_FACTOR,
-        icon=icon,
-    )
+    Built once per process, ``expand_templates`` fills in key and name.
+    """
 
+    domain: str
+    attribute: str
+    description: EntityDescription
+    name_suffix: str = ""
 
-def get_weight_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:weight-kilogram")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        native_unit_of_measurement=MASS_KILOGRAMS,
-        device_class=SensorDeviceClass.WEIGHT,
-        icon=icon,
-    )
+    def expand(self, domain_index: int | str) -> EntityDescription:
+        return replace(
+            self.description,
+            key=f"{self.domain}{domain_index}.{self.attribute}",
+            name=f"{self.domain.upper()} {domain_index} {self.attribute}{self.name_suffix}",
+        )
 
 
-def get_pump_binary_description(
-    domain_name, domain_index, attribute_key
-) -> OekofenBinaryAttributeDescription:
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:pump")
-    return OekofenBinaryAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key} Pump",
-        device_class=BinarySensorDeviceClass.POWER,
-        icon=icon,
+def _build_templates(
+    tables: tuple[tuple[dict[str, list[str] | str], EntityDescription, str], ...]
+) -> tuple[OekofenEntityTemplate, ...]:
+    """Return the templates of the (``*_BY_DOMAIN``, description, name
+    suffix) tables, the icons of ``const.ICONS`` override the default ones."""
+    templates = []
+    for attributes_by_domain, description, name_suffix in tables:
+        for domain, attributes in attributes_by_domain.items():
+            if isinstance(attributes, str):
+                attributes = [attributes]
+            for attribute in attributes:
+                icon = const.ICONS.get(domain, {}).get(attribute, description.icon)
+                templates.append(
+                    OekofenEntityTemplate(
+                        domain=domain,
+                        attribute=attribute,
+                        description=replace(description, icon=icon),
+                        name_suffix=name_suffix,
+                    )
+                )
+    return tuple(templates)
+
+
+def expand_templates(
+    templates: tuple[OekofenEntityTemplate, ...], data: dict[str, Any]
+) -> Iterator[tuple[OekofenEntityTemplate, int | str, EntityDescription]]:
+    """Yield (template, domain index, description) for the domain indexes
+    in ``data``, i.e. ``hk_indexes``."""
+    for template in templates:
+        for domain_index in data.get(f"{template.domain}_indexes", []):
+            yield template, domain_index, template.expand(domain_index)
+
+
+_TEMPERATURE = OekofenAttributeDescription(
+    native_unit_of_measurement=TEMP_CELSIUS,
+    device_class=SensorDeviceClass.TEMPERATURE,
+    icon="mdi:thermometer",
+)
+_STATETEXT = OekofenAttributeDescription(
+    entity_category=EntityCategory.DIAGNOSTIC,
+    icon="mdi:text",
+)
+_PUMP_PERCENTAGE = OekofenAttributeDescription(
+    native_unit_of_measurement=PERCENTAGE,
+    device_class=SensorDeviceClass.POWER_FACTOR,
+    icon="mdi:pump",
+)
+_PERCENTAGE = OekofenAttributeDescription(
+    native_unit_of_measurement=PERCENTAGE,
+    device_class=SensorDeviceClass.POWER_FACTOR,
+    icon="mdi:percent",
+)
+_WEIGHT = OekofenAttributeDescription(
+    native_unit_of_measurement=MASS_KILOGRAMS,
+    device_class=SensorDeviceClass.WEIGHT,
+    icon="mdi:weight-kilogram",
+)
+_ZS = OekofenAttributeDescription(
+    native_unit_of_measurement=UnitOfTime.SECONDS,
+    device_class=SensorDeviceClass.DURATION,
+    icon="mdi:clock",
+)
+_TOTAL_HOURS = OekofenAttributeDescription(
+    native_unit_of_measurement=UnitOfTime.HOURS,
+    device_class=SensorDeviceClass.DURATION,
+    icon="mdi:timeline",
+)
+_TOTAL_MINUTES = OekofenAttributeDescription(
+    native_unit_of_measurement=UnitOfTime.MINUTES,
+    device_class=SensorDeviceClass.DURATION,
+    icon="mdi:metronome",
+)
+_PUMP_BINARY = OekofenBinaryAttributeDescription(
+    device_class=BinarySensorDeviceClass.POWER,
+    icon="mdi:pump",
+)
+_BINARY = OekofenBinaryAttributeDescription(
+    device_class=BinarySensorDeviceClass.POWER,
+    icon="mdi:electric-switch",
+)
+_CONTROL = OekofenAttributeDescription(icon="mdi:electric-switch")
+
+SENSOR_TEMPLATES = _build_templates(
+    (
+        (const.TEMP_SENSORS_BY_DOMAIN, _TEMPERATURE, ""),
+        (const.STATE_SENSORS_BY_DOMAIN, _STATETEXT, ""),
+        (const.PUMP_PERCENTAGE_SENSORS_BY_DOMAIN, _PUMP_PERCENTAGE, " Pump"),
+        ({"thirdparty": ["L_state"]}, _TEMPERATURE, ""),
+        (const.NON_PUMP_PERCENTAGE_SENSORS_BY_DOMAIN, _PERCENTAGE, ""),
+        (const.NON_PUMP_BINARY_SENSORS_BY_DOMAIN, _BINARY, ""),
+        (const.WEIGHT_SENSORS_BY_DOMAIN, _WEIGHT, ""),
+        # tenth of seconds
+        (const.TIME_SENSORS_BY_DOMAIN, _ZS, ""),
+        (const.TOTAL_SENSORS_HOURS_BY_DOMAIN, _TOTAL_HOURS, ""),
+        (const.TOTAL_SENSORS_MINUTES_BY_DOMAIN, _TOTAL_MINUTES, ""),
+        (
+            {"meta": ["installateur_code"]},
+            replace(_STATETEXT, entity_registry_enabled_default=False),
+            "",
+        ),
     )
-
-
-def get_binary_description(
-    domain_name, domain_index, attribute_key
-) -> OekofenBinaryAttributeDescription:
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:electric-switch")
-    return OekofenBinaryAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        device_class=BinarySensorDeviceClass.POWER,
-        icon=icon,
+)
+BINARY_SENSOR_TEMPLATES = _build_templates(
+    (
+        (const.L_PUMP_BINARY_SENSORS_BY_DOMAIN, _PUMP_BINARY, " Pump"),
+        (const.PE_BINARY_SENSORS_BY_DOMAIN, _BINARY, ""),
     )
+)
+SWITCH_TEMPLATES = _build_templates(((const.SWITCHES_BY_DOMAIN, _CONTROL, ""),))
+BUTTON_TEMPLATES = _build_templates(((const.BUTTONS_BY_DOMAIN, _CONTROL, ""),))
+SELECT_TEMPLATES = _build_templates(
+    ((const.SELECT_BY_DOMAIN, OekofenAttributeDescription(icon="mdi:form-select"), ""),)
+)
+NUMBER_TEMPLATES = _build_templates(
+    ((const.NUMBERS_BY_DOMAIN, OekofenNumberDescription(icon="mdi:thermometer"), ""),)
+)
 
 
 def get_waterheater_description(
@@ -173,59 +347,10 @@ def get_waterheater_description(
     )
 
 
-def get_zs_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:clock")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        native_unit_of_measurement=UnitOfTime.SECONDS,
-        device_class=SensorDeviceClass.DURATION,
-        icon=icon,
-    )
-
-
-def get_total_hour_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:timeline")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        native_unit_of_measurement=UnitOfTime.HOURS,
-        device_class=SensorDeviceClass.DURATION,
-        icon=icon,
-    )
-
-
-def get_total_minute_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:metronome")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        native_unit_of_measurement=UnitOfTime.MINUTES,
-        device_class=SensorDeviceClass.DURATION,
-        icon=icon,
-    )
-
-
-def get_switch_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:electric-switch")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        icon=icon,
-    )
-
-
-def get_button_description(domain_name, domain_index, attribute_key):
-    icon = const.ICONS.get(domain_name, {}).get(attribute_key, "mdi:electric-switch")
-    return OekofenAttributeDescription(
-        key=f"{domain_name}{domain_index}.{attribute_key}",
-        name=f"{domain_name.upper()} {domain_index} {attribute_key}",
-        icon=icon,
-    )
-
-
 class OekofenHKSensorEntity(HAOekofenCoordinatorEntity, RestoreSensor):
     entity_description: OekofenAttributeDescription
+    # thirdparty sensor identity, only the readings are recorded
+    _unrecorded_attributes = frozenset(const.STATIC_ATTRIBUTES)
 
     def __init__(
         self,
@@ -233,11 +358,12 @@ class OekofenHKSensorEntity(HAOekofenCoordinatorEntity, RestoreSensor):
         oekofen_entity: HAOekofenEntity,
         entity_description: OekofenAttributeDescription,
     ) -> None:
-        super().__init__(coordinator, oekofen_entity)
+        super().__init__(coordinator, oekofen_entity, entity_description.key)
         self.entity_description = entity_description
         self._name = f"{oekofen_entity.device_name} {entity_description.name}"
         self._unique_id = f"{oekofen_entity.unique_id}-{entity_description.key}-{entity_description.index}"
         self._value: StateType | date | datetime | Decimal = None
+        self._oekofen_key = oekofen_entity.key_index.add(entity_description.key)
         self.async_update_device()
 
         _LOGGER.debug(
@@ -278,21 +404,45 @@ class OekofenHKSensorEntity(HAOekofenCoordinatorEntity, RestoreSensor):
     @property
     def extra_state_attributes(self):
         """Return the state attributes."""
-        key = self.entity_description.key
-        domain, attribute = key.split('.')
-        d_index = 0
-        if domain[-1].isdigit():
-            d_index = int(domain[-1])
-            domain = domain[0:-1]
-        oekofen_att = self._oekofen_entity.api.get_attribute(domain=domain, domain_index=d_index, attribute=attribute)
+        key = self._oekofen_key.key
+        oekofen_att = self._oekofen_entity.api.get_attribute_by_key(key)
         if oekofen_att:
             return oekofen_att.attributes
-        ignored_keys = const.IGNORE_WARNINGS_FOR_ATTRIBUTES
-        logger_text = f"No Oekofen.Attribute found for key={key}"
-        if key in ignored_keys:
-            _LOGGER.debug(logger_text)
-        else:
-            _LOGGER.warning(logger_text)
+        self._oekofen_entity.key_index.warn_missing_attribute(key)
+
+
+class OekofenPollStatsSensorEntity(HAOekofenCoordinatorEntity, SensorEntity):
+    """Timings and counters of the controller polls, see PollStats."""
+
+    entity_description: OekofenPollStatsDescription
+    # change with every poll
+    _unrecorded_attributes = frozenset({"histogram", "request_latency_p95", "last_error"})
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        oekofen_entity: HAOekofenEntity,
+        entity_description: OekofenPollStatsDescription,
+    ) -> None:
+        # no context, updated after every poll
+        super().__init__(coordinator, oekofen_entity)
+        self.entity_description = entity_description
+        self._name = f"{oekofen_entity.device_name} {entity_description.name}"
+        self._unique_id = f"{oekofen_entity.unique_id}-{entity_description.key}"
+        self._attr_extra_state_attributes = None
+        self.async_update_device()
+
+    @property
+    def available(self) -> bool:
+        """Failed polls are counted, too."""
+        return True
+
+    @callback
+    def async_update_device(self) -> None:
+        stats = self._oekofen_entity.api.stats
+        self._attr_native_value = self.entity_description.value(stats)
+        if self.entity_description.attributes is not None:
+            self._attr_extra_state_attributes = self.entity_description.attributes(stats)
 
 
 class OekofenBinarySensorEntity(HAOekofenCoordinatorEntity, BinarySensorEntity):
@@ -304,11 +454,12 @@ class OekofenBinarySensorEntity(HAOekofenCoordinatorEntity, BinarySensorEntity):
         oekofen_entity: HAOekofenEntity,
         entity_description: OekofenBinaryAttributeDescription,
     ) -> None:
-        super().__init__(coordinator, oekofen_entity)
+        super().__init__(coordinator, oekofen_entity, entity_description.key)
         self.entity_description = entity_description
         self._name = f"{oekofen_entity.device_name} {entity_description.name}"
         self._unique_id = f"{oekofen_entity.unique_id}-{entity_description.key}-{entity_description.index}"
         self._attr_is_on: bool = False
+        self._oekofen_key = oekofen_entity.key_index.add(entity_description.key)
         self.async_update_device()
 
     @callback
@@ -320,7 +471,48 @@ class OekofenBinarySensorEntity(HAOekofenCoordinatorEntity, BinarySensorEntity):
         self._attr_is_on = self.entity_description.value(data)
 
 
-class OekofenSwitchEntity(HAOekofenCoordinatorEntity, SwitchEntity):
+class OekofenWritableEntity(HAOekofenCoordinatorEntity):
+    """Entity of a controllable attribute, written through the write queue."""
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        oekofen_entity: HAOekofenEntity,
+        entity_description: EntityDescription,
+    ) -> None:
+        super().__init__(coordinator, oekofen_entity, entity_description.key)
+        self.entity_description = entity_description
+        self._name = f"{oekofen_entity.device_name} {entity_description.name}"
+        self._unique_id = f"{oekofen_entity.unique_id}-{entity_description.key}-{entity_description.index}"
+        self._value: StateType = None
+        self._oekofen_key = oekofen_entity.key_index.add(entity_description.key)
+        self.async_update_device()
+
+    @callback
+    def async_update_device(self) -> None:
+        if self.coordinator.data is None:
+            return
+        self._value = self.coordinator.data.get(self.entity_description.key)
+
+    def _get_api_attribute(self) -> oekofen_api.Attribute | None:
+        return self._oekofen_entity.api.get_attribute_by_key(self._oekofen_key.key)
+
+    async def _async_write_value(self, value) -> None:
+        # optimistic until the written domain is read back
+        self._value = value
+        self.async_write_ha_state()
+        try:
+            await self.coordinator.write_queue.async_write(
+                self._oekofen_key.key, self._get_api_attribute(), value
+            )
+        finally:
+            # the coordinator only updates the entity if the read back value
+            # differs from the one before the write, not from the optimistic
+            self.async_update_device()
+            self.async_write_ha_state()
+
+
+class OekofenSwitchEntity(OekofenWritableEntity, SwitchEntity):
     entity_description = OekofenAttributeDescription
 
     def __init__(
@@ -332,73 +524,85 @@ class OekofenSwitchEntity(HAOekofenCoordinatorEntity, SwitchEntity):
         oekofen_attribute,
         oekofen_domain_index,
     ):
-        super().__init__(coordinator, oekofen_entity)
-        self.entity_description = entity_description
-        self._name = f"{oekofen_entity.device_name} {entity_description.name}"
-        self._unique_id = f"{oekofen_entity.unique_id}-{entity_description.key}-{entity_description.index}"
-        self._value: StateType | date | datetime | Decimal = None
+        super().__init__(coordinator, oekofen_entity, entity_description)
         self._oekofen_domain = oekofen_domain
         self._oekofen_attribute = oekofen_attribute
         if oekofen_domain_index == "":
             self._oekofen_domain_index = 1
         else:
             self._oekofen_domain_index = oekofen_domain_index
-        self._oekofen_entity = oekofen_entity
-
-    # async def async_added_to_hass(self) -> None:
-    #    """Handle entity which will be added."""
-    #    await super().async_added_to_hass()
-    #    if self.coordinator.data is None:
-    #        sensor_data = await self.async_get_last_sensor_data()
-    #        if sensor_data is not None:
-    #            self._value = sensor_data.native_value
 
     def __repr__(self):
         return f"<OekofenSwitchEntity unique_id={self._unique_id}>"
 
-    @callback
-    def async_update_device(self) -> None:
-        if self.coordinator.data is None:
-            return
-
-        data = self.coordinator.data.get(self.entity_description.key)
-        if data is None:
-            self._value = None
-            _LOGGER.debug(
-                "key '%s' not in Netgear router response '%s'",
-                self.entity_description.key,
-                data,
-            )
-            return
-
-        self._value = self.entity_description.value(data)
-
     @property
     def is_on(self):
         """Return true if device is on."""
         return self._value in const.SWITCH_IS_ON_VALUES
 
-    def _get_api_attribute(self):
-        att = self._oekofen_entity.api.get_attribute(
-            domain=self._oekofen_domain,
-            attribute=self._oekofen_attribute,
-            domain_index=self._oekofen_domain_index,
-        )
-        return att
-
     async def async_turn_on(self, **kwargs):
-        att = self._get_api_attribute()
-        set_value = await self._oekofen_entity.api.set_attribute_value(
-            att, const.TURN_SWITCH_ON
-        )
-        self._value = set_value
+        await self._async_write_value(const.TURN_SWITCH_ON)
 
     async def async_turn_off(self, **kwargs):
-        att = self._get_api_attribute()
-        set_value = await self._oekofen_entity.api.set_attribute_value(
-            att, const.TURN_SWITCH_OFF
-        )
-        self._value = set_value
+        await self._async_write_value(const.TURN_SWITCH_OFF)
+
+
+class OekofenSelectEntity(OekofenWritableEntity, SelectEntity):
+    """Attribute with choices, i.e. ``hk1.mode_auto``."""
+
+    entity_description: OekofenAttributeDescription
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        oekofen_entity: HAOekofenEntity,
+        entity_description: OekofenAttributeDescription,
+        attribute: oekofen_api.Attribute,
+    ) -> None:
+        # {raw value: label}, i.e. {0: "Aus", 1: "Auto", ...}
+        self._choices: dict[int, str] = attribute.choices
+        self._attr_options = list(attribute.choices.values())
+        super().__init__(coordinator, oekofen_entity, entity_description)
+
+    @property
+    def current_option(self) -> str | None:
+        return self._choices.get(self._value)
+
+    async def async_select_option(self, option: str) -> None:
+        value = next(raw for raw, label in self._choices.items() if label == option)
+        await self._async_write_value(value)
+
+
+class OekofenNumberEntity(OekofenWritableEntity, NumberEntity):
+    """Setpoint with min/max, i.e. ``hk1.temp_heat``."""
+
+    entity_description: OekofenNumberDescription
+
+    def __init__(
+        self,
+        coordinator: DataUpdateCoordinator,
+        oekofen_entity: HAOekofenEntity,
+        entity_description: OekofenNumberDescription,
+        attribute: oekofen_api.Attribute,
+    ) -> None:
+        # not get_min_value(), it takes a raw minimum of 0 for no value and
+        # returns the current value instead
+        factor = attribute.factor or 1
+        self._attr_native_min_value = float(attribute.min) * factor
+        self._attr_native_max_value = float(attribute.max) * factor
+        if attribute.factor is not None:
+            self._attr_native_step = attribute.factor
+        self._attr_native_unit_of_measurement = attribute.unit
+        if attribute.unit == UnitOfTemperature.CELSIUS:
+            self._attr_device_class = NumberDeviceClass.TEMPERATURE
+        super().__init__(coordinator, oekofen_entity, entity_description)
+
+    @property
+    def native_value(self) -> float | None:
+        return self._value
+
+    async def async_set_native_value(self, value: float) -> None:
+        await self._async_write_value(value)
 
 
 class OekofenButtonEntity(ButtonEntity):
@@ -421,22 +625,15 @@ class OekofenButtonEntity(ButtonEntity):
         self._oekofen_domain = oekofen_domain
         self._oekofen_attribute = oekofen_attribute
         self._oekofen_domain_index = oekofen_domain_index
+        self._oekofen_key = oekofen_entity.key_index.add(entity_description.key)
 
     def __repr__(self):
         return f"<OekofenButtonEntity key={self._oekofen_domain}{self._oekofen_domain_index}.{self._oekofen_attribute}>"
 
     def _get_api_attribute(self):
-        _oekofen_domain_index = self._oekofen_domain_index
-        if isinstance(_oekofen_domain_index, str) and len(_oekofen_domain_index) == 0:
-            _oekofen_domain_index = 1
-        att = self._oekofen_entity.api.get_attribute(
-            domain=self._oekofen_domain,
-            attribute=self._oekofen_attribute,
-            domain_index=_oekofen_domain_index,
-        )
-        return att
+        return self._oekofen_entity.api.get_attribute_by_key(self._oekofen_key.key)
 
-    def press(self) -> None:
+    async def async_press(self) -> None:
         att = self._get_api_attribute()
         # very uncool part here
         if att.domain.name == "weather" and att.key == "refresh":
@@ -445,17 +642,19 @@ class OekofenButtonEntity(ButtonEntity):
             att.max = 1
 
         try:
-            self._oekofen_entity.api.set_attribute_value(att, const.TURN_SWITCH_ON)
+            await self.coordinator.write_queue.async_write(
+                self._oekofen_key.key, att, const.TURN_SWITCH_ON
+            )
         except Exception as e:
-            _LOGGER.error("[OekofenButtonEntity.press] Error on api.set_attribute_value: %s", str(e))
+            _LOGGER.error("[OekofenButtonEntity.async_press] Error on write_queue.async_write: %s", str(e))
 
     @property
     def unique_id(self) -> str:
         """Return a unique ID."""
-        if self._oekofen_domain_index:
+        if self._oekofen_domain_index == 1:
+            # registered without the index, kept for the entity registry
             return f"{self._oekofen_entity.unique_id}_{self._oekofen_domain}_{self._oekofen_attribute.lower()}"
-        else:
-            return f"{self._oekofen_entity.unique_id}_{self._oekofen_domain}_{self._oekofen_domain_index}_{self._oekofen_attribute.lower()}"
+        return f"{self._oekofen_entity.unique_id}_{self._oekofen_domain}_{self._oekofen_domain_index}_{self._oekofen_attribute.lower()}"
 
     @property
     def name(self) -> str:
@@ -483,7 +682,15 @@ class HAOekofenWaterHeaterEntity(HAOekofenCoordinatorEntity, WaterHeaterEntity):
         oekofen_entity: HAOekofenEntity,
         entity_description: OekofenWaterHeaterAttributeDescription,
     ) -> None:
-        super().__init__(coordinator, oekofen_entity)
+        domain = entity_description.key.split(".")[0]
+        super().__init__(
+            coordinator,
+            oekofen_entity,
+            tuple(
+                f"{domain}.{attr}"
+                for attr in set(entity_description.attr_config.values())
+            ),
+        )
         self.entity_description = entity_description
         self._name = f"{oekofen_entity.device_name} {entity_description.name}"
         self._unique_id = (
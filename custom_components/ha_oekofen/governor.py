@@ -0,0 +1,135 @@
+"""Serializes the requests to one controller."""
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any, TypeVar
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
+
+class OekofenRequestGovernor:
+    """Grants one request at a time, ``min_gap`` seconds after the last one.
+
+    The controller rejects requests coming faster than ~2.5 seconds. Waiting
+    requests are granted by priority (``const.REQUEST_PRIORITY_*``, lower
+    first), so a write jumps ahead of the pending poll requests. Identical
+    pending reads are merged into one request.
+
+    Cancelling a caller (i.e. the coordinator timeout) never leaves work
+    behind: a queued request is dropped, a running one is aborted and its
+    slot passed on after ``min_gap``, merged readers of a dropped read send
+    it again.
+    """
+
+    def __init__(self, min_gap: float = const.REQUEST_MIN_GAP) -> None:
+        self.min_gap = min_gap
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+        self._busy = False
+        self._last_request_end: float | None = None
+        self._grant_handle: asyncio.TimerHandle | None = None
+        self._pending_reads: dict[str, asyncio.Future[Any]] = {}
+
+    @property
+    def queue_size(self) -> int:
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    @asynccontextmanager
+    async def async_slot(self, priority: int) -> AsyncIterator[None]:
+        """Wait for the turn of a request, the controller is ours inside."""
+        await self._async_acquire(priority)
+        try:
+            yield
+        finally:
+            self._release(requested=True)
+
+    async def async_read(
+        self, key: str, request: Callable[[], Awaitable[_T]], priority: int
+    ) -> _T:
+        """Run ``request`` in a slot, merged with a pending read of ``key``."""
+        if (pending := self._pending_reads.get(key)) is not None:
+            _LOGGER.debug("[OekofenRequestGovernor.async_read] merged read %s", key)
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if not pending.cancelled() or asyncio.current_task().cancelling():
+                    raise
+                # dropped by the cancelled first reader, not by us
+                return await self.async_read(key, request, priority)
+
+        result_future: asyncio.Future[_T] = asyncio.get_running_loop().create_future()
+        # merged readers might be gone, don't log unretrieved exceptions
+        result_future.add_done_callback(
+            lambda future: future.cancelled() or future.exception()
+        )
+        self._pending_reads[key] = result_future
+        try:
+            async with self.async_slot(priority):
+                # started, later reads need a new request
+                self._pending_reads.pop(key, None)
+                result = await request()
+        except asyncio.CancelledError:
+            self._pending_reads.pop(key, None)
+            result_future.cancel()
+            raise
+        except Exception as err:
+            self._pending_reads.pop(key, None)
+            result_future.set_exception(err)
+            raise
+        result_future.set_result(result)
+        return result
+
+    async def _async_acquire(self, priority: int) -> None:
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), waiter))
+        self._schedule_grant()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # granted but no longer needed, pass the turn on
+                self._release(requested=False)
+            raise
+
+    def _release(self, requested: bool) -> None:
+        self._busy = False
+        if requested:
+            self._last_request_end = asyncio.get_running_loop().time()
+        self._schedule_grant()
+
+    def _schedule_grant(self) -> None:
+        if self._busy or self._grant_handle is not None:
+            return
+        # drop waiters cancelled while queued
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if not self._waiters:
+            return
+        loop = asyncio.get_running_loop()
+        delay = 0.0
+        if self._last_request_end is not None:
+            delay = self._last_request_end + self.min_gap - loop.time()
+        if delay > 0:
+            self._grant_handle = loop.call_later(delay, self._grant_next)
+        else:
+            self._grant_next()
+
+    def _grant_next(self) -> None:
+        self._grant_handle = None
+        if self._busy:
+            return
+        while self._waiters:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if not waiter.done():
+                self._busy = True
+                waiter.set_result(None)
+                return
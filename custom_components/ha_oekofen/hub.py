@@ -0,0 +1,53 @@
+"""State shared by the config entries of all controllers."""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+import aiohttp
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OekofenHub:
+    """Shares the HTTP session and a limit of the requests in flight.
+
+    The coordinators of the registered entries are spread over their update
+    interval (see ``get_phase``) instead of all polling at the same time.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        self.session: aiohttp.ClientSession = async_get_clientsession(hass)
+        self.request_limiter = asyncio.Semaphore(const.HUB_MAX_REQUESTS_IN_FLIGHT)
+        self._entry_ids: list[str] = []
+
+    @callback
+    def async_register(self, entry_id: str) -> CALLBACK_TYPE:
+        """Add ``entry_id`` to the schedule, returns the callback removing it."""
+        self._entry_ids.append(entry_id)
+        _LOGGER.debug("[OekofenHub.async_register] entries=%s", self._entry_ids)
+
+        @callback
+        def _async_unregister() -> None:
+            self._entry_ids.remove(entry_id)
+
+        return _async_unregister
+
+    def get_phase(self, entry_id: str) -> float:
+        """Return the offset of the schedule of ``entry_id`` as fraction of
+        its update interval, the entries are spread evenly."""
+        if entry_id not in self._entry_ids:
+            return 0.0
+        return self._entry_ids.index(entry_id) / len(self._entry_ids)
+
+
+@callback
+def async_get_hub(hass: HomeAssistant) -> OekofenHub:
+    """Return the hub, created with the first entry."""
+    if (hub := hass.data.get(const.KEY_HUB)) is None:
+        hub = hass.data[const.KEY_HUB] = OekofenHub(hass)
+    return hub
@@ -0,0 +1,79 @@
+"""Index of the data keys used by the entities."""
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+RE_KEY = re.compile(r"^(?P<domain>[a-z_]+?)(?P<index>\d*)\.(?P<attribute>.+)$")
+
+
+@dataclass(frozen=True)
+class OekofenKey:
+    """Parsed data key, i.e. "hk10.L_pump" -> hk, 10, L_pump."""
+
+    key: str
+    domain: str
+    domain_index: int | None
+    attribute: str
+    ignore_warnings: bool = False
+
+    @property
+    def domain_with_index(self) -> str:
+        if self.domain_index is None:
+            return self.domain
+        return f"{self.domain}{self.domain_index}"
+
+
+class OekofenKeyIndex:
+    """Keys are parsed once at platform setup, lookups are O(1)."""
+
+    def __init__(self) -> None:
+        self._keys: dict[str, OekofenKey] = {}
+        self._warned_keys: set[str] = set()
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._keys
+
+    def add(self, key: str) -> OekofenKey:
+        """Parse and add ``key``, returns the existing entry if known."""
+        if key in self._keys:
+            return self._keys[key]
+        match = RE_KEY.match(key)
+        if match is None:
+            raise ValueError(f"Invalid Oekofen key {key}")
+        index = match.group("index")
+        oekofen_key = OekofenKey(
+            key=key,
+            domain=match.group("domain"),
+            domain_index=int(index) if index else None,
+            attribute=match.group("attribute"),
+            ignore_warnings=key in const.IGNORE_WARNINGS_FOR_ATTRIBUTES,
+        )
+        self._keys[key] = oekofen_key
+        return oekofen_key
+
+    def get(self, key: str) -> OekofenKey | None:
+        return self._keys.get(key)
+
+    def keys(self) -> list[str]:
+        return list(self._keys)
+
+    def warn_missing_attribute(self, key: str) -> None:
+        """Log a missing Oekofen.Attribute once per key."""
+        if key in self._warned_keys:
+            return
+        self._warned_keys.add(key)
+        oekofen_key = self._keys.get(key)
+        logger_text = f"No Oekofen.Attribute found for key={key}"
+        if oekofen_key is not None and oekofen_key.ignore_warnings:
+            _LOGGER.debug(logger_text)
+        else:
+            _LOGGER.warning(logger_text)
@@ -0,0 +1,152 @@
+"""Import the CSV log as hourly long-term statistics."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import TYPE_CHECKING, Any
+
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.util import dt as dt_util
+from homeassistant.util import slugify
+
+from . import const
+
+if TYPE_CHECKING:
+    from . import HAOekofenEntity
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class HourBucket:
+    """Aggregated values of one key in one hour."""
+
+    count: int
+    total: float
+    min: float
+    max: float
+    last: float
+
+    @classmethod
+    def start(cls, value: float) -> HourBucket:
+        return cls(count=1, total=value, min=value, max=value, last=value)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        self.last = value
+
+    def as_list(self) -> list[float]:
+        return [self.count, self.total, self.min, self.max, self.last]
+
+
+class OekofenStatisticsImporter:
+    """Aggregates new CSV log rows per hour and imports them in batches.
+
+    The log position and the buckets of the unfinished hour are persisted
+    per ``entry.unique_id``, so an import continues where the last one
+    stopped. Re-importing an hour overwrites it, the import is idempotent.
+    The log has no counter columns (runtime, starts), every key is imported
+    as mean/min/max. Imports run one at a time, a second one waits and
+    continues from the state the first one stored.
+    """
+
+    def __init__(self, hass: HomeAssistant, ha_client: HAOekofenEntity) -> None:
+        self.hass = hass
+        self._ha_client = ha_client
+        self._units: dict[str, str | None] = {}
+        self._batches: dict[str, list[StatisticData]] = {}
+        self._lock = asyncio.Lock()
+
+    def _get_statistic_id(self, key: str) -> str:
+        return f"{const.DOMAIN}:{slugify(f'{self._ha_client.unique_id}_{key}')}"
+
+    def _add_hour(self, hour: datetime, buckets: dict[str, HourBucket]) -> None:
+        for key, bucket in buckets.items():
+            statistic = StatisticData(
+                start=hour,
+                mean=bucket.total / bucket.count,
+                min=bucket.min,
+                max=bucket.max,
+            )
+            self._batches.setdefault(key, []).append(statistic)
+
+    @callback
+    def _async_flush(self) -> None:
+        """Hand the collected statistics over to the recorder."""
+        for key, statistics in self._batches.items():
+            metadata = StatisticMetaData(
+                has_mean=True,
+                has_sum=False,
+                name=f"{self._ha_client.device_name} {key}",
+                source=const.DOMAIN,
+                statistic_id=self._get_statistic_id(key),
+                unit_of_measurement=self._units.get(key),
+            )
+            async_add_external_statistics(self.hass, metadata, statistics)
+        self._batches = {}
+
+    async def async_import(self) -> int:
+        """Import the rows since the last import, returns the imported hours."""
+        async with self._lock:
+            return await self._async_import()
+
+    async def _async_import(self) -> int:
+        storage = self._ha_client.storage
+        pending = storage.get(const.STORAGE_KEY_STATISTICS, {})
+        hour = dt_util.parse_datetime(pending["hour"]) if pending.get("hour") else None
+        buckets = {
+            key: HourBucket(*values) for key, values in pending.get("buckets", {}).items()
+        }
+        imported_hours = 0
+        batch_size = 0
+
+        try:
+            async for timestamp, values in self._ha_client.async_read_log():
+                row_hour = timestamp.replace(minute=0, second=0, microsecond=0)
+                if hour is not None and row_hour != hour:
+                    self._add_hour(hour, buckets)
+                    imported_hours += 1
+                    batch_size += len(buckets)
+                    buckets = {}
+                    if batch_size >= const.STATISTICS_BATCH_SIZE:
+                        self._async_flush()
+                        batch_size = 0
+                hour = row_hour
+                self._add_values(buckets, values)
+        finally:
+            self._async_flush()
+            # the unfinished hour is completed by the next import
+            storage.async_set(
+                const.STORAGE_KEY_STATISTICS,
+                {
+                    "hour": hour.isoformat() if hour else None,
+                    "buckets": {key: b.as_list() for key, b in buckets.items()},
+                },
+            )
+
+        _LOGGER.debug(
+            "[OekofenStatisticsImporter.async_import] imported %s hours for %s",
+            imported_hours,
+            self._ha_client.unique_id,
+        )
+        return imported_hours
+
+    def _add_values(self, buckets: dict[str, HourBucket], values: dict[str, Any]) -> None:
+        if not self._units:
+            self._units = {c.key: c.unit for c in self._ha_client.log_reader.columns}
+        for key, value in values.items():
+            if not isinstance(value, (int, float)):
+                continue
+            if key.split(".", 1)[1] in const.STATISTICS_IGNORED_ATTRIBUTES:
+                continue
+            if key in buckets:
+                buckets[key].add(value)
+            else:
+                buckets[key] = HourBucket.start(value)
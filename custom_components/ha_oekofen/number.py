@@ -0,0 +1,30 @@
+import logging
+
+from . import const
+from .entity import NUMBER_TEMPLATES, OekofenNumberEntity, expand_templates
+
+_LOGGER = logging.getLogger(__name__)
+
+
+async def async_setup_entry(hass, config_entry, async_add_entities):
+    entities = []
+    coordinator = hass.data[const.DOMAIN][config_entry.entry_id][const.KEY_COORDINATOR]
+    ha_oekofen = hass.data[const.DOMAIN][config_entry.entry_id][
+        const.KEY_OEKOFENHOMEASSISTANT
+    ]
+
+    for _, _, description in expand_templates(NUMBER_TEMPLATES, ha_oekofen.api.data):
+        attribute = ha_oekofen.api.get_attribute_by_key(description.key)
+        if attribute is None or attribute.min is None or attribute.max is None:
+            # not sent by this controller or without limits
+            continue
+        number_entity = OekofenNumberEntity(
+            coordinator=coordinator,
+            oekofen_entity=ha_oekofen,
+            entity_description=description,
+            attribute=attribute,
+        )
+        entities.append(number_entity)
+        _LOGGER.debug("Added Number entity %s", number_entity)
+
+    async_add_entities(entities)
@@ -0,0 +1,135 @@
+"""Timings and counters of the controller polls."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any
+
+from homeassistant.util import dt as dt_util
+
+from . import const
+
+
+@dataclass
+class PollRecord:
+    """One coordinator update, may consist of several requests."""
+
+    started: datetime
+    domains: list[str] | None = None
+    lock_wait: float = 0.0
+    latency: float = 0.0
+    requests: int = 0
+    bytes: int = 0
+    parse_time: float = 0.0
+    error: str | None = None
+
+    def as_dict(self) -> dict[str, Any]:
+        record = asdict(self)
+        record["started"] = self.started.isoformat()
+        return record
+
+
+@dataclass
+class PollStats:
+    """Rolling history of the last ``const.POLL_STATS_HISTORY`` polls."""
+
+    records: deque[PollRecord] = field(
+        default_factory=lambda: deque(maxlen=const.POLL_STATS_HISTORY)
+    )
+    success_count: int = 0
+    failure_count: int = 0
+    consecutive_failures: int = 0
+    # of all requests, also the ones outside of a poll
+    request_latencies: deque[float] = field(
+        default_factory=lambda: deque(maxlen=const.POLL_STATS_HISTORY)
+    )
+    requests_in_flight: int = 0
+    cancelled_requests: int = 0
+    # JSON password, removed from the error messages
+    redact: str | None = None
+    last_success: datetime | None = None
+    _current: PollRecord | None = None
+
+    @property
+    def last(self) -> PollRecord | None:
+        return self.records[-1] if self.records else None
+
+    @property
+    def last_successful(self) -> PollRecord | None:
+        return next((r for r in reversed(self.records) if r.error is None), None)
+
+    def start_poll(self, domains: list[str] | None, lock_wait: float) -> None:
+        self._current = PollRecord(
+            started=dt_util.utcnow(), domains=domains, lock_wait=lock_wait
+        )
+
+    def record_request(self, latency: float, size: int) -> None:
+        """Add a finished HTTP request to the current poll."""
+        self.request_latencies.append(latency)
+        if self._current is None:
+            return
+        self._current.requests += 1
+        self._current.latency += latency
+        self._current.bytes += size
+
+    def record_request_timeout(self, latency: float) -> None:
+        """Count a timed out request as latency sample, so a slow controller
+        raises the timeout."""
+        self.request_latencies.append(latency)
+
+    def request_latency_percentile(self, percentile: float) -> float | None:
+        """Return the ``percentile`` (0..1) of the last request latencies."""
+        if not self.request_latencies:
+            return None
+        latencies = sorted(self.request_latencies)
+        return latencies[min(int(len(latencies) * percentile), len(latencies) - 1)]
+
+    def record_parse(self, parse_time: float) -> None:
+        if self._current is not None:
+            self._current.parse_time += parse_time
+
+    def end_poll(self, error: Exception | None = None) -> None:
+        record = self._current
+        if record is None:
+            return
+        self._current = None
+        if error is None:
+            self.success_count += 1
+            self.consecutive_failures = 0
+            self.last_success = record.started
+        else:
+            self.failure_count += 1
+            self.consecutive_failures += 1
+            record.error = f"{type(error).__name__}: {error}"
+            if self.redact:
+                # aiohttp errors include the URL with the password
+                record.error = record.error.replace(
+                    f"/{self.redact}/", "/**REDACTED**/"
+                )
+        self.records.append(record)
+
+    def discard_poll(self) -> None:
+        """Forget the current poll, i.e. a successful ping fetched no data."""
+        self._current = None
+
+    def data_age(self) -> float | None:
+        """Seconds since the start of the last successful poll."""
+        if self.last_success is None:
+            return None
+        return (dt_util.utcnow() - self.last_success).total_seconds()
+
+    def latency_histogram(self) -> dict[str, int]:
+        """Count the latencies of the successful polls per bucket."""
+        histogram = {f"<= {bucket}s": 0 for bucket in const.POLL_LATENCY_BUCKETS}
+        histogram[f"> {const.POLL_LATENCY_BUCKETS[-1]}s"] = 0
+        for record in self.records:
+            if record.error is not None:
+                continue
+            for bucket in const.POLL_LATENCY_BUCKETS:
+                if record.latency <= bucket:
+                    histogram[f"<= {bucket}s"] += 1
+                    break
+            else:
+                histogram[f"> {const.POLL_LATENCY_BUCKETS[-1]}s"] += 1
+        return histogram
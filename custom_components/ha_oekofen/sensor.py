@@ -10,16 +10,11 @@ _LOGGER = logging.getLogger(__name__)
 
 from . import const
 from .entity import (
+    POLL_STATS_DESCRIPTIONS,
+    SENSOR_TEMPLATES,
     OekofenHKSensorEntity,
-    get_temperature_description,
-    get_statetext_description,
-    get_percentage_description,
-    get_pump_percent_description,
-    get_zs_description,
-    get_total_hour_description,
-    get_total_minute_description,
-    get_weight_description,
-    get_binary_description,
+    OekofenPollStatsSensorEntity,
+    expand_templates,
 )
 
 
@@ -33,187 +28,24 @@ async def async_setup_entry(
     ha_oekofen = hass.data[const.DOMAIN][config_entry.entry_id][
         const.KEY_OEKOFENHOMEASSISTANT
     ]
-    entities = []
-
-    # TEMP_SENSORS_BY_DOMAIN
-    for domain_name, attribute_names in const.TEMP_SENSORS_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes", [""])
-        for domain_index in domain_indexes:
-            for attribute_name in attribute_names:
-                sensor_entity = OekofenHKSensorEntity(
-                    coordinator=coordinator,
-                    oekofen_entity=ha_oekofen,
-                    entity_description=get_temperature_description(
-                        domain_name=domain_name,
-                        domain_index=domain_index,
-                        attribute_key=attribute_name,
-                    ),
-                )
-                entities.append(sensor_entity)
+    entities = [
+        OekofenHKSensorEntity(
+            coordinator=coordinator,
+            oekofen_entity=ha_oekofen,
+            entity_description=description,
+        )
+        for _, _, description in expand_templates(SENSOR_TEMPLATES, ha_oekofen.api.data)
+    ]
 
-    # STATE_SENSORS_BY_DOMAIN
-    for domain_name, attribute_name in const.STATE_SENSORS_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes", [])
-        for domain_index in domain_indexes:
-            sensor_entity = OekofenHKSensorEntity(
+    # Poll diagnostics
+    for poll_stats_descr in POLL_STATS_DESCRIPTIONS:
+        entities.append(
+            OekofenPollStatsSensorEntity(
                 coordinator=coordinator,
                 oekofen_entity=ha_oekofen,
-                entity_description=get_statetext_description(
-                    domain_name=domain_name,
-                    domain_index=domain_index,
-                    attribute_key=attribute_name,
-                ),
+                entity_description=poll_stats_descr,
             )
-            entities.append(sensor_entity)
-
-    # PUMP_PERCENTAGE_SENSORS_BY_DOMAIN
-    for domain_name, attribute_names in const.PUMP_PERCENTAGE_SENSORS_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes", [])
-        for domain_index in domain_indexes:
-            for attribute_name in attribute_names:
-                sensor_entity = OekofenHKSensorEntity(
-                    coordinator=coordinator,
-                    oekofen_entity=ha_oekofen,
-                    entity_description=get_pump_percent_description(
-                        domain_name=domain_name,
-                        domain_index=domain_index,
-                        attribute_key=attribute_name,
-                    ),
-                )
-                entities.append(sensor_entity)
-
-    # Thirdparty
-    thirdparty_indexes = ha_oekofen.api.data.get(f"thirdparty_indexes", [])
-    for domain_index in thirdparty_indexes:
-        extra_attributes = ha_oekofen.api.get_attribute(domain='thirdparty', domain_index=domain_index, attribute='L_state').attributes
-        sensor_entity = OekofenHKSensorEntity(
-            coordinator=coordinator,
-            oekofen_entity=ha_oekofen,
-            #entity_description=get_statetext_description(
-            entity_description=get_temperature_description(
-                domain_name="thirdparty",
-                domain_index=domain_index,
-                attribute_key="L_state",
-            ),
         )
-        entities.append(sensor_entity)
-
-    # Percentage sensors (non-pump)
-    for (
-        domain_name,
-        attribute_names,
-    ) in const.NON_PUMP_PERCENTAGE_SENSORS_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes", [])
-        for domain_index in domain_indexes:
-            for attribute_name in attribute_names:
-                percent_descr = get_percentage_description(
-                    domain_name=domain_name,
-                    domain_index=domain_index,
-                    attribute_key=attribute_name,
-                )
-                mod_entity = OekofenHKSensorEntity(
-                    coordinator=coordinator,
-                    oekofen_entity=ha_oekofen,
-                    entity_description=percent_descr,
-                )
-                entities.append(mod_entity)
-
-    # Non Pump binary sensors by domain
-    for domain_name, attribute_names in const.NON_PUMP_BINARY_SENSORS_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes", [])
-        for domain_index in domain_indexes:
-            for attribute_name in attribute_names:
-                binary_descr = get_binary_description(
-                    domain_name=domain_name,
-                    domain_index=domain_index,
-                    attribute_key=attribute_name,
-                )
-                mod_entity = OekofenHKSensorEntity(
-                    coordinator=coordinator,
-                    oekofen_entity=ha_oekofen,
-                    entity_description=binary_descr,
-                )
-                entities.append(mod_entity)
-
-    # Weight sensors by domain
-    for domain_name, attribute_names in const.WEIGHT_SENSORS_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes", [])
-        for domain_index in domain_indexes:
-            for attribute_name in attribute_names:
-                weight_descr = get_weight_description(
-                    domain_name=domain_name,
-                    domain_index=domain_index,
-                    attribute_key=attribute_name,
-                )
-                mod_entity = OekofenHKSensorEntity(
-                    coordinator=coordinator,
-                    oekofen_entity=ha_oekofen,
-                    entity_description=weight_descr,
-                )
-                entities.append(mod_entity)
-
-    # Ten'th zs-Sensors / TIME_SENSORS_BY_DOMAIN
-    for domain_name, attribute_names in const.TIME_SENSORS_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes", [])
-        for domain_index in domain_indexes:
-            for attribute_name in attribute_names:
-                zs_descr = get_zs_description(
-                    domain_name=domain_name,
-                    domain_index=domain_index,
-                    attribute_key=attribute_name,
-                )
-                mod_entity = OekofenHKSensorEntity(
-                    coordinator=coordinator,
-                    oekofen_entity=ha_oekofen,
-                    entity_description=zs_descr,
-                )
-                entities.append(mod_entity)
-
-    for domain_name, attribute_names in const.TOTAL_SENSORS_HOURS_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes")
-        for domain_index in domain_indexes:
-            for attribute_name in attribute_names:
-                hour_descr = get_total_hour_description(
-                    domain_name=domain_name,
-                    domain_index=domain_index,
-                    attribute_key=attribute_name,
-                )
-                mod_entity = OekofenHKSensorEntity(
-                    coordinator=coordinator,
-                    oekofen_entity=ha_oekofen,
-                    entity_description=hour_descr,
-                )
-                entities.append(mod_entity)
-
-    for domain_name, attribute_names in const.TOTAL_SENSORS_MINUTES_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes")
-        for domain_index in domain_indexes:
-            for attribute_name in attribute_names:
-                min_descr = get_total_minute_description(
-                    domain_name=domain_name,
-                    domain_index=domain_index,
-                    attribute_key=attribute_name,
-                )
-                mod_entity = OekofenHKSensorEntity(
-                    coordinator=coordinator,
-                    oekofen_entity=ha_oekofen,
-                    entity_description=min_descr,
-                )
-                entities.append(mod_entity)
-
-    # Installateur Code Sensor
-    ics_descr = get_statetext_description(
-        domain_name='meta',
-        domain_index="",
-        attribute_key='installateur_code'
-    )
-    ics_descr.entity_registry_enabled_default = False
-    ics_entity = OekofenHKSensorEntity(
-        coordinator=coordinator,
-        oekofen_entity=ha_oekofen,
-        entity_description=ics_descr
-    )
-    entities.append(ics_entity)
 
     # add to Homeassistant
     async_add_entities(entities)
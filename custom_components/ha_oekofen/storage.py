@@ -0,0 +1,37 @@
+"""Persisted state per Oekofen controller."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from . import const
+
+
+class OekofenStorage:
+    """Sections of persisted data, stored per ``entry.unique_id``."""
+
+    def __init__(self, hass: HomeAssistant, unique_id: str) -> None:
+        self._store: Store[dict[str, Any]] = Store(
+            hass, const.STORAGE_VERSION, f"{const.DOMAIN}.{unique_id}"
+        )
+        self._data: dict[str, Any] = {}
+
+    async def async_load(self) -> None:
+        self._data = await self._store.async_load() or {}
+
+    def get(self, section: str, default: Any = None) -> Any:
+        return self._data.get(section, default)
+
+    @callback
+    def async_set(self, section: str, value: Any) -> None:
+        """Set ``section`` and save delayed."""
+        self._data[section] = value
+        self._store.async_delay_save(lambda: self._data, const.STORAGE_SAVE_DELAY)
+
+    async def async_save(self) -> None:
+        await self._store.async_save(self._data)
+
+    async def async_remove(self) -> None:
+        await self._store.async_remove()
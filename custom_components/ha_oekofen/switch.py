@@ -1,7 +1,7 @@
 import logging
 
 from . import const
-from .entity import get_switch_description, OekofenSwitchEntity
+from .entity import SWITCH_TEMPLATES, OekofenSwitchEntity, expand_templates
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -14,23 +14,18 @@ async def async_setup_entry(hass, config_entry, async_add_entities):
         const.KEY_OEKOFENHOMEASSISTANT
     ]
 
-    for domain_name, attribute_names in const.SWITCHES_BY_DOMAIN.items():
-        domain_indexes = ha_oekofen.api.data.get(f"{domain_name}_indexes", [""])
-        for domain_index in domain_indexes:
-            for attribute_name in attribute_names:
-                switch_entity = OekofenSwitchEntity(
-                    coordinator=coordinator,
-                    oekofen_entity=ha_oekofen,
-                    entity_description=get_switch_description(
-                        domain_name=domain_name,
-                        domain_index=domain_index,
-                        attribute_key=attribute_name,
-                    ),
-                    oekofen_domain=domain_name,
-                    oekofen_attribute=attribute_name,
-                    oekofen_domain_index=domain_index,
-                )
-                entities.append(switch_entity)
-                _LOGGER.debug("Added Switch entitiy %s", switch_entity)
+    for template, domain_index, description in expand_templates(
+        SWITCH_TEMPLATES, ha_oekofen.api.data
+    ):
+        switch_entity = OekofenSwitchEntity(
+            coordinator=coordinator,
+            oekofen_entity=ha_oekofen,
+            entity_description=description,
+            oekofen_domain=template.domain,
+            oekofen_attribute=template.attribute,
+            oekofen_domain_index=domain_index,
+        )
+        entities.append(switch_entity)
+        _LOGGER.debug("Added Switch entitiy %s", switch_entity)
 
     async_add_entities(entities)
@@ -64,4 +64,3 @@ async def async_setup_entry(
             entities.append(entity)
 
     async_add_entities(entities)
-    print("[water_heater.async_setup_entry] done %s" % coordinator)
@@ -0,0 +1,137 @@
+"""Debounced attribute writes with a confirm-read of the written domains."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any
+
+import async_timeout
+import oekofen_api
+from homeassistant.core import HomeAssistant, callback
+
+from . import const
+
+if TYPE_CHECKING:
+    from .coordinator import OekofenCoordinator
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class OekofenWriteQueue:
+    """Collects writes for ``const.WRITE_DEBOUNCE_SECONDS`` and sends them.
+
+    Rapid writes to the same attribute are debounced, only the last value is
+    sent. The controller takes one assignment per request, so writes to
+    different attributes are sent one after another, but the written
+    domains are read back once for all of them and then polled in a burst
+    until they settle. Writes queued during a flush are sent by the same
+    flush in the next round.
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: OekofenCoordinator) -> None:
+        self.hass = hass
+        self._coordinator = coordinator
+        self._pending: dict[str, tuple[oekofen_api.Attribute, Any]] = {}
+        self._waiters: dict[str, list[asyncio.Future[None]]] = {}
+        self._flush_timer: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+
+    async def async_write(self, key: str, att: oekofen_api.Attribute, value: Any) -> None:
+        """Queue ``value`` for ``key`` ("ww1.heat_once"), returns when confirmed."""
+        self._pending[key] = (att, value)
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        # the caller might be gone, don't log unretrieved exceptions
+        waiter.add_done_callback(lambda future: future.cancelled() or future.exception())
+        self._waiters.setdefault(key, []).append(waiter)
+        self._async_schedule_flush()
+        # a write and a read back per queued write
+        timeout = const.WRITE_DEBOUNCE_SECONDS + (
+            self._coordinator.ha_client.api.get_update_timeout(2 * len(self._pending))
+        )
+        async with async_timeout.timeout(timeout):
+            await waiter
+
+    @callback
+    def _async_schedule_flush(self) -> None:
+        if self._flush_task is not None or self._flush_timer is not None:
+            # the running flush or the scheduled one sends the write
+            return
+        self._flush_timer = self.hass.loop.call_later(
+            const.WRITE_DEBOUNCE_SECONDS, self._async_start_flush
+        )
+
+    @callback
+    def _async_start_flush(self) -> None:
+        self._flush_timer = None
+        self._flush_task = self.hass.async_create_background_task(
+            self._async_flush(), "oekofen write queue flush"
+        )
+
+    async def _async_flush(self) -> None:
+        try:
+            while self._pending:
+                pending, self._pending = self._pending, {}
+                waiters, self._waiters = self._waiters, {}
+                await self._async_send(pending, waiters)
+        finally:
+            self._flush_task = None
+            if self._pending:
+                # left by a cancelled flush
+                self._async_schedule_flush()
+
+    async def _async_send(
+        self,
+        pending: dict[str, tuple[oekofen_api.Attribute, Any]],
+        waiters: dict[str, list[asyncio.Future[None]]],
+    ) -> None:
+        """Send ``pending``, read the written domains back and resolve the
+        ``waiters``, also if sending or reading back fails."""
+        errors: dict[str, Exception] = {}
+        done = False
+        try:
+            domains = set()
+            for key, (att, value) in pending.items():
+                _LOGGER.debug("[OekofenWriteQueue._async_send] %s=%s", key, value)
+                try:
+                    await self._coordinator.ha_client.api.async_set_attribute_value(
+                        att, value
+                    )
+                except Exception as err:
+                    errors[key] = err
+                    continue
+                domains.add(key.split(".", 1)[0])
+
+            if domains:
+                self._coordinator.async_start_burst(sorted(domains))
+                await self._coordinator.async_refresh_domains(sorted(domains))
+            done = True
+        except Exception as err:
+            # sent but not confirmed, i.e. the read back failed
+            _LOGGER.debug("[OekofenWriteQueue._async_send] not confirmed: %s", err)
+            for key in pending:
+                errors.setdefault(key, err)
+            done = True
+        finally:
+            for key, key_waiters in waiters.items():
+                for waiter in key_waiters:
+                    if waiter.done():
+                        continue
+                    if not done:
+                        # flush cancelled, i.e. on shutdown
+                        waiter.cancel()
+                    elif key in errors:
+                        waiter.set_exception(errors[key])
+                    else:
+                        waiter.set_result(None)
+
+    async def async_shutdown(self) -> None:
+        if self._flush_timer is not None:
+            self._flush_timer.cancel()
+            self._flush_timer = None
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+        for key_waiters in self._waiters.values():
+            for waiter in key_waiters:
+                waiter.cancel()
+        self._pending = {}
+        self._waiters = {}
@@ -0,0 +1,219 @@
+"""Benchmark of the platform setup and the coordinator fan-out.
+
+Drives ``async_setup_entry`` of the sensor, binary_sensor, switch and button
+platforms with payloads of the simulator (``oekofen_simulator.py``) with
+1 to 32 indexes per domain, no network involved. Per index count it measures:
+
+- construction time and memory per entity (platform ``async_setup_entry``)
+- time to add the entities to hass
+- one coordinator refresh with all values changed / nothing changed
+
+Needs Home Assistant installed, run from the repository root::
+
+    python scripts/benchmark.py --output benchmark.json
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from homeassistant import config_entries, loader
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+    restore_state,
+)
+from homeassistant.helpers.entity_platform import EntityPlatform
+
+from custom_components.ha_oekofen import (
+    HAOekofenEntity,
+    binary_sensor,
+    button,
+    const,
+    number,
+    select,
+    sensor,
+    switch,
+)
+from custom_components.ha_oekofen.api import OekofenAsyncApi
+from custom_components.ha_oekofen.coordinator import OekofenCoordinator
+from oekofen_simulator import INDEXED_DOMAINS, build_payload
+
+PLATFORM_MODULES = {
+    "sensor": sensor,
+    "binary_sensor": binary_sensor,
+    "switch": switch,
+    "button": button,
+    "select": select,
+    "number": number,
+}
+DEFAULT_INDEX_COUNTS = [1, 2, 4, 8, 16, 32]
+
+
+async def async_make_hass(config_dir: str) -> HomeAssistant:
+    hass = HomeAssistant(config_dir)
+    hass.config.skip_pip = True
+    loader.async_setup(hass)
+    await asyncio.gather(ar.async_load(hass), dr.async_load(hass), er.async_load(hass))
+    hass.config_entries = config_entries.ConfigEntries(hass, {})
+    await hass.config_entries.async_initialize()
+    hass.data["entity_info"] = {}
+    await restore_state.async_load(hass)
+    return hass
+
+
+def make_entry(index_count: int) -> ConfigEntry:
+    return ConfigEntry(
+        version=2,
+        domain=const.DOMAIN,
+        title=f"Bench {index_count}",
+        data={
+            "host": "127.0.0.1",
+            "port": 4321,
+            "password": "PASS",
+            "scan_interval": 30,
+        },
+        source="user",
+        unique_id=f"bench_{index_count}",
+        options={},
+    )
+
+
+def changed_payload(payload: dict, round_nr: int) -> dict:
+    """Return ``payload`` with every numeric value changed."""
+    payload = copy.deepcopy(payload)
+    for domain_data in payload.values():
+        for value in domain_data.values():
+            if isinstance(value, dict) and value.get("val", "").lstrip("-").isdigit():
+                value["val"] = str(int(value["val"]) + round_nr)
+    return payload
+
+
+async def async_bench_index_count(hass: HomeAssistant, index_count: int, rounds: int) -> dict:
+    entry = make_entry(index_count)
+    payload = build_payload({domain: index_count for domain in INDEXED_DOMAINS})
+
+    ha_client = HAOekofenEntity(hass, entry)
+    ha_client.api = OekofenAsyncApi(session=None, host="127.0.0.1", json_password="PASS")
+    ha_client.api._parse_raw_data(payload)
+    coordinator = OekofenCoordinator(hass, ha_client, update_interval=ha_client.update_interval)
+    coordinator.async_set_updated_data(ha_client.api.data)
+    hass.data.setdefault(const.DOMAIN, {})[entry.entry_id] = {
+        const.KEY_OEKOFENHOMEASSISTANT: ha_client,
+        const.KEY_COORDINATOR: coordinator,
+    }
+
+    result = {"index_count": index_count, "platforms": {}}
+    all_entities = []
+    entity_platforms = []
+    for platform_name, module in PLATFORM_MODULES.items():
+        entities = []
+        tracemalloc.start()
+        start = time.perf_counter()
+        await module.async_setup_entry(hass, entry, entities.extend)
+        construct_time = time.perf_counter() - start
+        memory, _peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        entity_platform = EntityPlatform(
+            hass=hass,
+            logger=logging.getLogger(platform_name),
+            domain=platform_name,
+            platform_name=const.DOMAIN,
+            platform=None,
+            scan_interval=timedelta(seconds=30),
+            entity_namespace=None,
+        )
+        start = time.perf_counter()
+        await entity_platform.async_add_entities(entities)
+        add_time = time.perf_counter() - start
+        all_entities.extend(entities)
+        entity_platforms.append(entity_platform)
+
+        result["platforms"][platform_name] = {
+            "entities": len(entities),
+            "entities_added": len(entity_platform.entities),
+            "construct_seconds": construct_time,
+            "add_seconds": add_time,
+            "memory_per_entity_bytes": memory / len(entities) if entities else 0,
+        }
+
+    changed_times = []
+    unchanged_times = []
+    for round_nr in range(1, rounds + 1):
+        data = OekofenAsyncApi(session=None, host="127.0.0.1", json_password="PASS")._parse_raw_data(
+            changed_payload(payload, round_nr)
+        )
+        start = time.perf_counter()
+        coordinator.async_set_updated_data(data)
+        await hass.async_block_till_done()
+        changed_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        coordinator.async_set_updated_data(dict(data))
+        await hass.async_block_till_done()
+        unchanged_times.append(time.perf_counter() - start)
+
+    result["entities"] = len(all_entities)
+    result["refresh_changed_seconds"] = statistics.median(changed_times)
+    result["refresh_unchanged_seconds"] = statistics.median(unchanged_times)
+    result["refresh_changed_per_entity_seconds"] = (
+        result["refresh_changed_seconds"] / len(all_entities) if all_entities else 0
+    )
+
+    for entity_platform in entity_platforms:
+        await entity_platform.async_reset()
+    hass.data[const.DOMAIN].pop(entry.entry_id)
+    return result
+
+
+async def async_main(index_counts: list[int], rounds: int) -> dict:
+    logging.basicConfig(level=logging.ERROR)
+    with tempfile.TemporaryDirectory() as config_dir:
+        hass = await async_make_hass(config_dir)
+        results = [
+            await async_bench_index_count(hass, index_count, rounds)
+            for index_count in index_counts
+        ]
+        await hass.async_stop(force=True)
+    return {
+        "python": sys.version.split()[0],
+        "rounds": rounds,
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--indexes", type=int, nargs="+", default=DEFAULT_INDEX_COUNTS,
+                        help="indexes per domain to benchmark")
+    parser.add_argument("--rounds", type=int, default=5, help="coordinator refreshes per index count")
+    parser.add_argument("--output", help="write the JSON result to this file instead of stdout")
+    args = parser.parse_args()
+
+    results = asyncio.run(async_main(args.indexes, args.rounds))
+    text = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as output:
+            output.write(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
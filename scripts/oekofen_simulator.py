@@ -0,0 +1,394 @@
+"""Local simulator of the Oekofen JSON interface.
+
+Serves the same shapes as a Pellematic touch controller, so the
+integration can be run and measured without a device:
+
+- ``/<password>/all`` and ``/<password>/all?`` (with formats)
+- ``/<password>/<domain><index>`` and ``?`` variant, i.e. ``pe1?``
+- ``/<password>/??`` version text
+- ``/<password>/log`` minute resolution CSV log, supports Range requests
+- ``/<password>/<domain><index>.<attribute>=<value>`` writes
+
+Usage::
+
+    python scripts/oekofen_simulator.py --hk 4 --pe 2 --latency 0.3 --min-gap 2.5
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+import copy
+import json
+import logging
+import math
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+_LOGGER = logging.getLogger("oekofen_simulator")
+
+CHARSET = "ISO-8859-1"
+VERSION_TEXT = "Oekofen JSON Interface   V4.00b   http://www.oekofen.at\n"
+OFF_ON = "0:Aus|1:Ein"
+PE_STATES = (
+    "0:Dauerlauf|1:Start|2:Zuendung|3:Softstart|4:Leistungsbrand|5:Nachlauf|"
+    "6:Aus|7:Saugen|8:! Asche !|9:! Pellets !|10:Pell Switch|11:Störung|12:Einmessen"
+)
+PE_TYPES = (
+    "0:PE|1:PES|2:PEK|3:PESK|4:SMART V1|5:SMART V2|6:CONDENS|7:SMART XS|"
+    "8:SMART V3|9:COMPACT|10:AIR"
+)
+
+
+def _temp(val: int, min_val: str = "-32768", max_val: str = "32767") -> dict:
+    return {"val": str(val), "unit": "?C", "factor": "0.1", "min": min_val, "max": max_val}
+
+
+def _percent(val: int) -> dict:
+    return {"val": str(val), "unit": "%", "factor": "1", "min": "0.0", "max": "100.0"}
+
+
+def _kg(val: int) -> dict:
+    return {"val": str(val), "unit": "kg", "factor": "1", "min": "-32768", "max": "32767"}
+
+
+def _choice(val: int, choices: str) -> dict:
+    return {"val": str(val), "format": choices}
+
+
+DOMAIN_TEMPLATES = {
+    "system": {
+        "system_info": "system global variables",
+        "L_ambient": _temp(-25),
+        "L_errors": {"val": "0", "factor": "1", "min": "-32768", "max": "32767"},
+        "L_usb_stick": {"val": "false", "format": OFF_ON},
+    },
+    "weather": {
+        "weather_info": "current weather data",
+        "L_temp": _temp(-20),
+        "L_clouds": _percent(20),
+        "refresh": {"val": "false"},
+        "oekomode": _choice(1, OFF_ON),
+    },
+    "forecast": {
+        "forecast_info": "date|temp|cloud|speed|image|code|unit[|sunrise|sunset]",
+        "L_w_0": {"val": "Di, 7 Feb 21:50|-2|20|9 km/h|02n|801|C|08:00|17:11", "length": "20"},
+    },
+    "hk": {
+        "hk_info": "heating circuit data",
+        "L_roomtemp_act": _temp(215),
+        "L_roomtemp_set": _temp(220),
+        "L_flowtemp_act": _temp(486),
+        "L_flowtemp_set": _temp(475),
+        "L_state": {"val": "32", "factor": "1"},
+        "L_statetext": "Heizbetrieb aktiv",
+        "L_pump": _choice(1, OFF_ON),
+        "mode_auto": _choice(1, "0:Aus|1:Auto|2:Heizen|3:Absenken"),
+        "time_prg": _choice(0, "0:Zeit 1|1:Zeit 2"),
+        "temp_setback": _temp(138, "100.0", "400.0"),
+        "temp_heat": _temp(220, "100.0", "400.0"),
+        "temp_vacation": _temp(150, "100.0", "400.0"),
+        "name": {"val": "", "length": "20"},
+        "oekomode": _choice(3, "0:Aus|1:Komfort|2:Minimum|3:?kologisch"),
+    },
+    "pu": {
+        "pu_info": "accu data",
+        "L_tpo_act": _temp(564),
+        "L_tpo_set": _temp(525),
+        "L_tpm_act": _temp(395),
+        "L_tpm_set": _temp(525),
+        "L_pump_release": _temp(620),
+        "L_pump": _percent(45),
+        "L_state": {"val": "256", "factor": "1"},
+        "L_statetext": "Anforderung Ein",
+    },
+    "ww": {
+        "ww_info": "domestic hot water data",
+        "L_temp_set": _temp(500),
+        "L_ontemp_act": _temp(559),
+        "L_offtemp_act": _temp(559),
+        "L_pump": _choice(0, OFF_ON),
+        "L_state": {"val": "8200", "factor": "1"},
+        "L_statetext": "Zeit au?erhalb Zeitprogramm|Anforderung Aus",
+        "time_prg": _choice(1, "0:Zeit 1|1:Zeit 2"),
+        "mode_auto": _choice(1, "0:Aus|1:Auto|2:Ein"),
+        "mode_dhw": _choice(1, "0:Aus|1:Auto|2:Ein"),
+        "heat_once": _choice(0, OFF_ON),
+        "temp_min_set": _temp(450, "80.0", "800.0"),
+        "temp_max_set": _temp(600, "80.0", "800.0"),
+        "use_boiler_heat": _choice(0, OFF_ON),
+        "oekomode": _choice(3, "0:Aus|1:Komfort|2:Minimum|3:?kologisch"),
+    },
+    "sk": {
+        "sk_info": "solar circuit data",
+        "L_koll_temp": _temp(-41),
+        "L_spu": _temp(387),
+        "L_pump": _percent(0),
+        "L_state": {"val": "32", "factor": "1"},
+        "L_statetext": "Differenz Kollektor-Speicher zu niedrig",
+        "mode": _choice(1, OFF_ON),
+        "spu_max": _temp(750, "200.0", "900.0"),
+    },
+    "pe": {
+        "pe_info": "pellematic data",
+        "L_temp_act": _temp(631),
+        "L_temp_set": _temp(760),
+        "L_ext_temp": _temp(-32768),
+        "L_frt_temp_act": _temp(7785),
+        "L_frt_temp_set": _temp(6927),
+        "L_frt_temp_end": _temp(8000),
+        "L_br": _choice(1, OFF_ON),
+        "L_ak": _choice(0, OFF_ON),
+        "L_not": _choice(1, OFF_ON),
+        "L_stb": _choice(1, OFF_ON),
+        "L_modulation": {"val": "100", "unit": "%", "factor": "1", "min": "-32768", "max": "32767"},
+        "L_uw_speed": {"val": "45", "unit": "%", "factor": "1", "min": "-32768", "max": "32767"},
+        "L_fluegas": {"val": "60", "unit": "%", "factor": "1", "min": "-32768", "max": "32767"},
+        "L_currentairflow": {"val": "50", "unit": "%", "factor": "1", "min": "-32768", "max": "32767"},
+        "L_state": _choice(4, PE_STATES),
+        "L_statetext": "Leistungsbrand",
+        "L_type": _choice(0, PE_TYPES),
+        "L_starts": {"val": "14191", "factor": "1"},
+        "L_runtime": {"val": "23306", "unit": "h", "factor": "1"},
+        "L_avg_runtime": {"val": "98", "unit": "min", "factor": "1"},
+        "L_runtimeburner": {"val": "250", "unit": "zs", "factor": "0.1", "min": "-32768", "max": "32767"},
+        "L_resttimeburner": {"val": "350", "unit": "zs", "factor": "0.1", "min": "-32768", "max": "32767"},
+        "L_lowpressure": {"val": "-30", "unit": "EH", "factor": "1", "min": "-32768", "max": "32767"},
+        "L_lowpressure_set": {"val": "-30", "unit": "EH", "factor": "1", "min": "-32768", "max": "32767"},
+        "L_uw_release": _temp(620),
+        "L_uw": {"val": "45", "unit": "%", "factor": "1", "min": "-32768", "max": "32767"},
+        "L_storage_fill": _kg(2020),
+        "L_storage_min": _kg(400),
+        "L_storage_max": _kg(6000),
+        "L_storage_popper": _kg(0),
+        "storage_fill_today": _kg(0),
+        "storage_fill_yesterday": _kg(20),
+        "mode": _choice(1, "0:Aus|1:Auto|2:Ein"),
+    },
+    "thirdparty": {
+        "thirdparty_info": "thirdparty sensor data",
+        "L_state": {"val": "1|shelly|ht|1|215|45|80|1697000000|192.168.1.50"},
+    },
+    "error": {},
+}
+
+# domains always served once, without index
+SINGLE_DOMAINS = ["system", "weather", "forecast"]
+INDEXED_DOMAINS = ["hk", "pu", "ww", "sk", "pe", "thirdparty"]
+
+# CSV log columns, (title, domain, attribute)
+LOG_COLUMNS_BY_DOMAIN = {
+    "hk": [("VL Ist[°C]", "L_flowtemp_act"), ("VL Soll[°C]", "L_flowtemp_set"),
+           ("RT Ist[°C]", "L_roomtemp_act"), ("RT Soll[°C]", "L_roomtemp_set"),
+           ("Pumpe", "L_pump")],
+    "ww": [("EinT Ist[°C]", "L_ontemp_act"), ("AusT Ist[°C]", "L_offtemp_act"),
+           ("Soll[°C]", "L_temp_set"), ("Pumpe", "L_pump")],
+    "pu": [("TPO Ist[°C]", "L_tpo_act"), ("TPM Ist[°C]", "L_tpm_act"), ("Pumpe", "L_pump")],
+    "pe": [("KT[°C]", "L_temp_act"), ("KT_SOLL[°C]", "L_temp_set"),
+           ("Modulation[%]", "L_modulation"), ("FRT Ist[°C]", "L_frt_temp_act"),
+           ("Einschublaufzeit[zs]", "L_runtimeburner"), ("Fuellstand[kg]", "L_storage_fill"),
+           ("Status", "L_state")],
+}
+
+
+def build_payload(indexes: dict[str, int]) -> dict:
+    """Return an ``all?`` payload with ``indexes[domain]`` indexed domains."""
+    payload = {}
+    for domain in SINGLE_DOMAINS:
+        payload[domain] = copy.deepcopy(DOMAIN_TEMPLATES[domain])
+    for domain in INDEXED_DOMAINS:
+        for index in range(1, indexes.get(domain, 0) + 1):
+            payload[f"{domain}{index}"] = copy.deepcopy(DOMAIN_TEMPLATES[domain])
+    payload["error"] = {}
+    return payload
+
+
+def strip_formats(domain_data: dict) -> dict:
+    """Values only, like the controller without "?"."""
+    return {
+        key: value["val"] if isinstance(value, dict) else value
+        for key, value in domain_data.items()
+    }
+
+
+class OekofenSimulator:
+    """aiohttp application simulating one controller."""
+
+    def __init__(
+        self,
+        password: str = "PASS",
+        indexes: dict[str, int] | None = None,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        min_gap: float = 0.0,
+        log_hours: int = 24,
+        seed: int | None = None,
+    ) -> None:
+        self.password = password
+        self.payload = build_payload(indexes or {"hk": 1, "pu": 1, "ww": 1, "pe": 1})
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.min_gap = min_gap
+        self.log_start = datetime.now().replace(second=0, microsecond=0) - timedelta(
+            hours=log_hours
+        )
+        self.random = random.Random(seed)
+        self.requests: list[str] = []
+        self._last_request = 0.0
+
+    def _simulate_values(self) -> None:
+        """Let the frequently changing values move a bit."""
+        minute = time.time() / 60
+        for domain, data in self.payload.items():
+            if domain.startswith("pe"):
+                data["L_temp_act"]["val"] = str(int(650 + 50 * math.sin(minute)))
+                data["L_modulation"]["val"] = str(self.random.randint(30, 100))
+                data["L_fluegas"]["val"] = str(self.random.randint(40, 80))
+            elif domain.startswith("hk"):
+                data["L_flowtemp_act"]["val"] = str(int(480 + 20 * math.sin(minute)))
+
+    def _log_csv(self) -> bytes:
+        header = ["Datum ", "Zeit ", "AT [°C]"]
+        columns = []
+        for domain, domain_columns in LOG_COLUMNS_BY_DOMAIN.items():
+            index = 1
+            while f"{domain}{index}" in self.payload:
+                for title, attribute in domain_columns:
+                    header.append(f"{domain.upper()}{index} {title}")
+                    columns.append((f"{domain}{index}", attribute))
+                index += 1
+        lines = [";".join(header) + ";"]
+        now = datetime.now()
+        row_dt = self.log_start
+        while row_dt <= now:
+            minute = row_dt.timestamp() / 60
+            cells = [row_dt.strftime("%d.%m.%Y"), row_dt.strftime("%H:%M:%S"), "-2,5"]
+            for domain, attribute in columns:
+                att = self.payload[domain][attribute]
+                value = float(att["val"]) if att["val"].lstrip("-").isdigit() else 0
+                if att.get("factor") == "0.1" and att.get("unit") == "?C":
+                    cells.append(f"{value / 10 + math.sin(minute):.1f}".replace(".", ","))
+                else:
+                    cells.append(str(int(value)))
+            lines.append(";".join(cells) + ";")
+            row_dt += timedelta(minutes=1)
+        return ("\r\n".join(lines) + "\r\n").encode(CHARSET)
+
+    async def handle(self, request: web.Request) -> web.StreamResponse:
+        raw_path = request.raw_path
+        self.requests.append(raw_path)
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+
+        now = time.monotonic()
+        too_fast = now - self._last_request < self.min_gap
+        self._last_request = now
+        if too_fast:
+            # the controller answers too fast requests with an error page
+            return web.Response(status=429, text="Too many requests")
+        if self.error_rate and self.random.random() < self.error_rate:
+            return web.Response(status=500, text="Simulated error")
+
+        prefix = f"/{self.password}/"
+        if not raw_path.startswith(prefix):
+            return web.Response(status=401, text="Wrong password")
+        path = raw_path[len(prefix):]
+
+        if path in ("", "??"):
+            return web.Response(body=VERSION_TEXT.encode(CHARSET))
+        if path == "log":
+            return self._log_response(request)
+        if "=" in path:
+            return self._write(path)
+
+        with_formats = path.endswith("?")
+        name = path.rstrip("?")
+        self._simulate_values()
+        if name == "all":
+            data = self.payload
+        elif name in self.payload:
+            data = {name: self.payload[name]}
+        else:
+            return web.Response(status=404, text="Unknown domain")
+        if not with_formats:
+            data = {domain: strip_formats(values) for domain, values in data.items()}
+        return web.Response(
+            body=json.dumps(data).encode(CHARSET), content_type="application/json"
+        )
+
+    def _write(self, path: str) -> web.Response:
+        key, value = path.split("=", 1)
+        domain, attribute = key.split(".", 1)
+        att = self.payload.get(domain, {}).get(attribute)
+        if not isinstance(att, dict):
+            return web.Response(status=404, text="Unknown attribute")
+        att["val"] = value
+        return web.Response(text="true")
+
+    def _log_response(self, request: web.Request) -> web.Response:
+        body = self._log_csv()
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", request.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2) or len(body) - 1), len(body) - 1)
+            if start >= len(body):
+                return web.Response(
+                    status=416, headers={"Content-Range": f"bytes */{len(body)}"}
+                )
+            return web.Response(
+                status=206,
+                body=body[start : end + 1],
+                headers={"Content-Range": f"bytes {start}-{end}/{len(body)}"},
+            )
+        return web.Response(body=body)
+
+    def make_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", self.handle)
+        return app
+
+    async def async_start(self, host: str = "127.0.0.1", port: int = 4321) -> web.AppRunner:
+        runner = web.AppRunner(self.make_app())
+        await runner.setup()
+        await web.TCPSite(runner, host, port).start()
+        return runner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=4321)
+    parser.add_argument("--password", default="PASS")
+    for domain in INDEXED_DOMAINS:
+        parser.add_argument(f"--{domain}", type=int, default=0 if domain in ("sk", "thirdparty") else 1,
+                            help=f"number of {domain} indexes")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds added to each response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="random extra latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="share of requests answered with 500")
+    parser.add_argument("--min-gap", type=float, default=0.0,
+                        help="minimum seconds between requests, faster requests get 429 (controller uses ~2.5)")
+    parser.add_argument("--log-hours", type=int, default=24, help="hours of CSV log history")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    simulator = OekofenSimulator(
+        password=args.password,
+        indexes={domain: getattr(args, domain) for domain in INDEXED_DOMAINS},
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        min_gap=args.min_gap,
+        log_hours=args.log_hours,
+        seed=args.seed,
+    )
+    logging.basicConfig(level=logging.INFO)
+    web.run_app(simulator.make_app(), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""Tests for the chunked CSV log reader."""
+from datetime import datetime
+
+import aiohttp
+import oekofen_api
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.ha_oekofen import const
+from custom_components.ha_oekofen.csv_log import LogPosition, OekofenLogReader
+
+pytestmark = pytest.mark.asyncio
+
+HEADER = "Datum ;Zeit ;AT [°C];PE1 KT[°C];\r\n"
+
+
+def make_log(*minutes: int, day: int = 18) -> bytes:
+    rows = "".join(
+        f"{day:02}.10.2026;12:{minute:02}:00;-2,5;{60 + minute},1;\r\n"
+        for minute in minutes
+    )
+    return (HEADER + rows).encode(oekofen_api.const.CHARSET)
+
+
+class FakeApi:
+    """Serves ``log`` like the controller, with or without Range support."""
+
+    def __init__(self, log: bytes, ranges: bool = True) -> None:
+        self.log = log
+        self.ranges = ranges
+        self.requests: list[int] = []
+
+    async def async_fetch_range(self, path: str, start: int, size: int) -> tuple[bytes, bool]:
+        assert path == const.CSV_LOG_PATH
+        self.requests.append(start)
+        if not self.ranges:
+            return self.log, False
+        if start >= len(self.log):
+            raise aiohttp.ClientResponseError(
+                request_info=None,
+                history=(),
+                status=416,
+                headers={aiohttp.hdrs.CONTENT_RANGE: f"bytes */{len(self.log)}"},
+            )
+        return self.log[start : start + size], True
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch: pytest.MonkeyPatch) -> None:
+    # a few rows per chunk, the header fits into one
+    monkeypatch.setattr(const, "CSV_LOG_CHUNK_SIZE", 100)
+
+
+async def read_rows(reader: OekofenLogReader) -> list[tuple[datetime, dict]]:
+    return [row async for row in reader.async_read_rows()]
+
+
+async def test_read_in_chunks() -> None:
+    api = FakeApi(make_log(*range(10)))
+    reader = OekofenLogReader(api)
+
+    rows = await read_rows(reader)
+
+    assert [values["pe1.L_temp_act"] for _, values in rows] == [
+        60 + minute + 0.1 for minute in range(10)
+    ]
+    assert rows[0][1]["system.L_ambient"] == -2.5
+    assert rows[0][0] == datetime(2026, 10, 18, 12, 0, tzinfo=dt_util.UTC)
+    assert len(api.requests) > 2
+    assert reader.position.offset == len(api.log)
+    assert reader.position.header[:2] == ["Datum ", "Zeit "]
+
+
+async def test_nothing_new() -> None:
+    api = FakeApi(make_log(0, 1))
+    reader = OekofenLogReader(api)
+    await read_rows(reader)
+    api.requests.clear()
+
+    assert await read_rows(reader) == []
+    # one request answered with 416
+    assert api.requests == [len(api.log)]
+    assert reader.position.offset == len(api.log)
+
+
+async def test_appended_rows_and_partial_line() -> None:
+    api = FakeApi(make_log(0, 1))
+    reader = OekofenLogReader(api)
+    await read_rows(reader)
+    offset = reader.position.offset
+    api.requests.clear()
+
+    # the last row is still being written
+    api.log = make_log(0, 1, 2, 3) + b"18.10.2026;12:04:00;-2"
+    rows = await read_rows(reader)
+
+    assert [values["pe1.L_temp_act"] for _, values in rows] == [62.1, 63.1]
+    assert api.requests[0] == offset
+    assert reader.position.offset == len(make_log(0, 1, 2, 3))
+
+    api.log = make_log(0, 1, 2, 3, 4)
+    rows = await read_rows(reader)
+    assert [values["pe1.L_temp_act"] for _, values in rows] == [64.1]
+
+
+async def test_rotated_log_shorter_than_offset() -> None:
+    api = FakeApi(make_log(*range(10)))
+    reader = OekofenLogReader(api)
+    await read_rows(reader)
+
+    # the next day's log, smaller than the last offset
+    api.log = make_log(0, 1, day=19)
+    rows = await read_rows(reader)
+
+    assert [timestamp.day for timestamp, _ in rows] == [19, 19]
+    assert reader.position.offset == len(api.log)
+
+
+async def test_rotated_log_not_reread() -> None:
+    api = FakeApi(make_log(0, 1, 2))
+    position = LogPosition.from_dict(
+        {
+            "offset": 10000,
+            "last_timestamp": "2026-10-18T12:01:00+00:00",
+            "header": HEADER.rstrip("\r\n").split(";"),
+        }
+    )
+    reader = OekofenLogReader(api, position)
+
+    rows = await read_rows(reader)
+
+    # read from the start, the rows already imported are dropped
+    assert api.requests[:2] == [10000, 0]
+    assert [timestamp.minute for timestamp, _ in rows] == [2]
+
+
+async def test_range_not_supported() -> None:
+    api = FakeApi(make_log(0, 1), ranges=False)
+    reader = OekofenLogReader(api)
+    await read_rows(reader)
+    assert reader.position.offset == len(api.log)
+
+    api.log = make_log(0, 1, 2)
+    rows = await read_rows(reader)
+
+    # the whole log is read once, the lines before the offset skipped
+    assert [timestamp.minute for timestamp, _ in rows] == [2]
+    assert len(api.requests) == 2
+
+    # rotated, the whole body is smaller than the offset
+    api.log = make_log(0, day=19)
+    rows = await read_rows(reader)
+    assert [timestamp.day for timestamp, _ in rows] == [19]
+
+
+async def test_other_errors_are_raised() -> None:
+    api = FakeApi(make_log(0))
+    reader = OekofenLogReader(api)
+
+    async def async_fetch_range(path: str, start: int, size: int) -> tuple[bytes, bool]:
+        raise aiohttp.ClientResponseError(request_info=None, history=(), status=500)
+
+    api.async_fetch_range = async_fetch_range
+    with pytest.raises(aiohttp.ClientResponseError):
+        await read_rows(reader)
@@ -0,0 +1,189 @@
+"""Tests for the request governor."""
+import asyncio
+
+import pytest
+
+from custom_components.ha_oekofen import const
+from custom_components.ha_oekofen.governor import OekofenRequestGovernor
+
+pytestmark = pytest.mark.asyncio
+
+MIN_GAP = 0.05
+
+
+async def test_gap_between_requests() -> None:
+    governor = OekofenRequestGovernor(min_gap=MIN_GAP)
+    loop = asyncio.get_running_loop()
+
+    async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+        pass
+    first_end = loop.time()
+    async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+        second_start = loop.time()
+
+    assert second_start - first_end >= MIN_GAP * 0.9
+
+
+async def test_priority_order() -> None:
+    governor = OekofenRequestGovernor(min_gap=MIN_GAP)
+    order = []
+
+    async def request(name: str, priority: int) -> None:
+        async with governor.async_slot(priority):
+            order.append(name)
+
+    async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+        tasks = [
+            asyncio.create_task(request("background", const.REQUEST_PRIORITY_BACKGROUND)),
+            asyncio.create_task(request("poll", const.REQUEST_PRIORITY_POLL)),
+            asyncio.create_task(request("write", const.REQUEST_PRIORITY_WRITE)),
+        ]
+        await asyncio.sleep(0)
+        assert governor.queue_size == 3
+    await asyncio.gather(*tasks)
+
+    assert order == ["write", "poll", "background"]
+
+
+async def test_merged_reads() -> None:
+    governor = OekofenRequestGovernor(min_gap=MIN_GAP)
+    calls = 0
+
+    async def request() -> dict:
+        nonlocal calls
+        calls += 1
+        return {"pe1": {}}
+
+    async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+        tasks = [
+            asyncio.create_task(
+                governor.async_read("all", request, const.REQUEST_PRIORITY_POLL)
+            )
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0)
+    results = await asyncio.gather(*tasks)
+
+    assert calls == 1
+    assert results == [{"pe1": {}}] * 3
+
+
+async def test_read_after_start_is_not_merged() -> None:
+    governor = OekofenRequestGovernor(min_gap=MIN_GAP)
+    started = asyncio.Event()
+    release = asyncio.Event()
+    calls = 0
+
+    async def request() -> int:
+        nonlocal calls
+        calls += 1
+        started.set()
+        await release.wait()
+        return calls
+
+    first = asyncio.create_task(
+        governor.async_read("all", request, const.REQUEST_PRIORITY_POLL)
+    )
+    await started.wait()
+    # the running request might not include the latest state
+    second = asyncio.create_task(
+        governor.async_read("all", request, const.REQUEST_PRIORITY_POLL)
+    )
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await first == 1
+    assert await second == 2
+
+
+async def test_cancelled_waiter_is_dropped() -> None:
+    governor = OekofenRequestGovernor(min_gap=MIN_GAP)
+    granted = []
+
+    async def request(name: str) -> None:
+        async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+            granted.append(name)
+
+    async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+        cancelled = asyncio.create_task(request("cancelled"))
+        waiting = asyncio.create_task(request("waiting"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        await asyncio.sleep(0)
+        assert governor.queue_size == 1
+    await waiting
+
+    assert cancelled.cancelled()
+    assert granted == ["waiting"]
+
+
+async def test_cancelled_after_grant_passes_turn_on() -> None:
+    # without a gap the next waiter is granted on release
+    governor = OekofenRequestGovernor(min_gap=0)
+    requests = 0
+
+    async def request() -> None:
+        nonlocal requests
+        async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+            requests += 1
+
+    async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+        granted = asyncio.create_task(request())
+        waiting = asyncio.create_task(request())
+        await asyncio.sleep(0)
+    # granted, but cancelled before it runs
+    assert governor.queue_size == 1
+    granted.cancel()
+
+    await asyncio.wait_for(waiting, 1)
+    assert granted.cancelled()
+    assert requests == 1
+
+
+async def test_cancelled_leader_of_merged_read() -> None:
+    governor = OekofenRequestGovernor(min_gap=MIN_GAP)
+    calls = 0
+
+    async def request() -> str:
+        nonlocal calls
+        calls += 1
+        return "data"
+
+    async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+        leader = asyncio.create_task(
+            governor.async_read("all", request, const.REQUEST_PRIORITY_POLL)
+        )
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(
+            governor.async_read("all", request, const.REQUEST_PRIORITY_POLL)
+        )
+        await asyncio.sleep(0)
+        leader.cancel()
+        await asyncio.sleep(0)
+
+    # the follower sends the read again instead of being cancelled
+    assert await asyncio.wait_for(follower, 1) == "data"
+    assert leader.cancelled()
+    assert calls == 1
+
+
+async def test_cancelled_follower_keeps_leader() -> None:
+    governor = OekofenRequestGovernor(min_gap=MIN_GAP)
+
+    async def request() -> str:
+        return "data"
+
+    async with governor.async_slot(const.REQUEST_PRIORITY_POLL):
+        leader = asyncio.create_task(
+            governor.async_read("all", request, const.REQUEST_PRIORITY_POLL)
+        )
+        await asyncio.sleep(0)
+        follower = asyncio.create_task(
+            governor.async_read("all", request, const.REQUEST_PRIORITY_POLL)
+        )
+        await asyncio.sleep(0)
+        follower.cancel()
+        await asyncio.sleep(0)
+
+    assert await asyncio.wait_for(leader, 1) == "data"
+    assert follower.cancelled()
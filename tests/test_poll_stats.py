@@ -0,0 +1,63 @@
+"""Tests for the poll statistics."""
+from custom_components.ha_oekofen.poll_stats import PollStats
+
+
+def test_request_latency_percentile() -> None:
+    stats = PollStats()
+    assert stats.request_latency_percentile(0.95) is None
+
+    for latency in (5.0, 1.0, 4.0, 2.0, 3.0, 6.0, 9.0, 7.0, 10.0, 8.0):
+        stats.record_request(latency, 100)
+    assert stats.request_latency_percentile(0.0) == 1.0
+    assert stats.request_latency_percentile(0.5) == 6.0
+    assert stats.request_latency_percentile(0.95) == 10.0
+    assert stats.request_latency_percentile(1.0) == 10.0
+
+
+def test_request_timeout_counts_as_latency() -> None:
+    stats = PollStats()
+    stats.record_request(1.0, 100)
+    stats.record_request_timeout(30.0)
+    assert stats.request_latency_percentile(0.95) == 30.0
+
+
+def test_end_poll_counts() -> None:
+    stats = PollStats()
+    stats.start_poll(["pe1"], 0.0)
+    stats.record_request(1.5, 200)
+    stats.end_poll()
+    assert stats.success_count == 1
+    assert stats.last.requests == 1
+    assert stats.last.bytes == 200
+    assert stats.last_success == stats.last.started
+
+    for _ in range(2):
+        stats.start_poll(None, 0.0)
+        stats.end_poll(TimeoutError())
+    assert stats.failure_count == 2
+    assert stats.consecutive_failures == 2
+    assert stats.last_successful is stats.records[0]
+
+    stats.start_poll(None, 0.0)
+    stats.end_poll()
+    assert stats.consecutive_failures == 0
+
+
+def test_end_poll_redacts_password() -> None:
+    stats = PollStats(redact="SECRET")
+    stats.start_poll(None, 0.0)
+    stats.end_poll(
+        ValueError("500, message='Error', url=URL('http://10.0.0.5:4321/SECRET/all?')")
+    )
+    assert "SECRET" not in stats.last.error
+    assert "/**REDACTED**/all?" in stats.last.error
+    assert stats.last.error.startswith("ValueError: ")
+
+
+def test_discard_poll() -> None:
+    stats = PollStats()
+    stats.start_poll(None, 0.0)
+    stats.discard_poll()
+    stats.end_poll()
+    assert not stats.records
+    assert stats.success_count == 0
@@ -0,0 +1,146 @@
+"""Tests for the debounced write queue."""
+import asyncio
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+import pytest_asyncio
+
+from custom_components.ha_oekofen import const
+from custom_components.ha_oekofen.write_queue import OekofenWriteQueue
+
+pytestmark = pytest.mark.asyncio
+
+DEBOUNCE = 0.05
+
+
+class FakeApi:
+    """Records the written values, optionally blocking the first write."""
+
+    def __init__(self) -> None:
+        self.writes: list[tuple[str, Any]] = []
+        self.block = asyncio.Event()
+        self.block.set()
+        self.writing = asyncio.Event()
+
+    async def async_set_attribute_value(self, att: Any, value: Any) -> None:
+        self.writing.set()
+        await self.block.wait()
+        self.writes.append((att, value))
+
+    def get_update_timeout(self, requests: int = 1) -> float:
+        return 1.0 * requests
+
+
+class FakeCoordinator:
+    def __init__(self) -> None:
+        self.ha_client = SimpleNamespace(api=FakeApi())
+        self.refreshed: list[list[str]] = []
+        self.refresh_error: Exception | None = None
+
+    def async_start_burst(self, domains: list[str]) -> None:
+        pass
+
+    async def async_refresh_domains(self, domains: list[str]) -> None:
+        self.refreshed.append(domains)
+        if self.refresh_error is not None:
+            raise self.refresh_error
+
+
+@pytest.fixture
+def coordinator() -> FakeCoordinator:
+    return FakeCoordinator()
+
+
+@pytest_asyncio.fixture
+async def queue(monkeypatch: pytest.MonkeyPatch, coordinator: FakeCoordinator):
+    monkeypatch.setattr(const, "WRITE_DEBOUNCE_SECONDS", DEBOUNCE)
+    loop = asyncio.get_running_loop()
+    hass = SimpleNamespace(
+        loop=loop,
+        async_create_background_task=lambda target, name: loop.create_task(target),
+    )
+    queue = OekofenWriteQueue(hass, coordinator)
+    yield queue
+    await queue.async_shutdown()
+
+
+async def test_debounce_sends_last_value(
+    queue: OekofenWriteQueue, coordinator: FakeCoordinator
+) -> None:
+    first = asyncio.create_task(queue.async_write("hk1.mode_auto", "hk1.mode_auto", 1))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(queue.async_write("hk1.mode_auto", "hk1.mode_auto", 2))
+    other = asyncio.create_task(queue.async_write("ww1.heat_once", "ww1.heat_once", 1))
+    await asyncio.wait_for(asyncio.gather(first, second, other), 1)
+
+    assert coordinator.ha_client.api.writes == [
+        ("hk1.mode_auto", 2),
+        ("ww1.heat_once", 1),
+    ]
+    # read back once for all writes
+    assert coordinator.refreshed == [["hk1", "ww1"]]
+
+
+async def test_write_during_flush(
+    queue: OekofenWriteQueue, coordinator: FakeCoordinator
+) -> None:
+    api = coordinator.ha_client.api
+    api.block.clear()
+    first = asyncio.create_task(queue.async_write("hk1.mode_auto", "hk1.mode_auto", 1))
+    await asyncio.wait_for(api.writing.wait(), 1)
+
+    # arrives while the flush is sending the first write
+    second = asyncio.create_task(queue.async_write("hk1.mode_auto", "hk1.mode_auto", 2))
+    await asyncio.sleep(DEBOUNCE * 2)
+    assert not second.done()
+    api.block.set()
+    await asyncio.wait_for(asyncio.gather(first, second), 1)
+
+    assert api.writes == [("hk1.mode_auto", 1), ("hk1.mode_auto", 2)]
+    assert coordinator.refreshed == [["hk1"], ["hk1"]]
+
+
+async def test_failed_read_back(
+    queue: OekofenWriteQueue, coordinator: FakeCoordinator
+) -> None:
+    coordinator.refresh_error = RuntimeError("read back failed")
+
+    with pytest.raises(RuntimeError):
+        await asyncio.wait_for(
+            queue.async_write("hk1.mode_auto", "hk1.mode_auto", 1), 1
+        )
+
+
+async def test_failed_write(
+    queue: OekofenWriteQueue, coordinator: FakeCoordinator
+) -> None:
+    api = coordinator.ha_client.api
+
+    async def async_set_attribute_value(att: Any, value: Any) -> None:
+        if att == "hk1.mode_auto":
+            raise ValueError("rejected")
+        api.writes.append((att, value))
+
+    api.async_set_attribute_value = async_set_attribute_value
+    failed = asyncio.create_task(queue.async_write("hk1.mode_auto", "hk1.mode_auto", 1))
+    sent = asyncio.create_task(queue.async_write("ww1.heat_once", "ww1.heat_once", 1))
+    await asyncio.wait([failed, sent], timeout=1)
+
+    assert isinstance(failed.exception(), ValueError)
+    assert sent.result() is None
+    # only the written domain is read back
+    assert coordinator.refreshed == [["ww1"]]
+
+
+async def test_shutdown_cancels_pending(
+    queue: OekofenWriteQueue, coordinator: FakeCoordinator
+) -> None:
+    write = asyncio.create_task(queue.async_write("hk1.mode_auto", "hk1.mode_auto", 1))
+    await asyncio.sleep(0)
+    await queue.async_shutdown()
+
+    with pytest.raises(asyncio.CancelledError):
+        await write
+    await asyncio.sleep(DEBOUNCE * 2)
+    assert not coordinator.ha_client.api.writes